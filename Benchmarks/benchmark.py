@@ -0,0 +1,366 @@
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from Entities.board import Board, BoardError
+from Service.service import Service
+
+
+'''
+The benchmarks measure how the main operations of the game scale with the size of the board.
+Every benchmark is run for every DIM of the sweep, on a board seeded with SEED, in two passes:
+    - a timing pass, which measures the latency of every single operation (the setup is not measured)
+    - a memory pass, with tracemalloc turned on, which measures how many bytes every operation leaves allocated, and
+      the peak memory of the whole benchmark (the boards included)
+
+Usage (from the root of the project):
+    python -m Benchmarks.benchmark                              - run the whole sweep and compare it to the baseline
+    python -m Benchmarks.benchmark --dims 7 101 --output r.json - run some of the sizes and save the results
+    python -m Benchmarks.benchmark --save-baseline              - run the sweep and make it the new baseline
+
+The timing pass is run 'repeats' times and the fastest of them is kept, since a measurement can only be slowed down
+by the rest of the machine, never sped up. Every run also times a fixed piece of Python, REFERENCE_OPERATIONS long
+(the fastest of REFERENCE_REPEATS times, 'reference_ns' in 'meta'), so the comparison can tell how much faster the
+machine (and the Python) of the baseline was, and scales the baseline by it.
+
+The comparison flags a benchmark when:
+    - for some DIM, its median latency is more than 'tolerance' times the (scaled) baseline's
+    - it scales worse than the baseline: the exponent 'e' of latency ~ DIM^e, fitted over the sweep, is more than
+      'exponent_tolerance' higher (e.g. an O(DIM) scan in a move turns an exponent near 0 into one near 1)
+The latencies below 'floor' (on both sides) aren't compared, since a few hundred nanoseconds more or less on them are
+only noise (the timer and the call itself); the DIMs where they are that small aren't used for the fit either.
+The process exits with the code 1 if anything is flagged.
+'''
+SEED = 2021
+DEFAULT_DIMS = [7, 31, 101, 501, 1001, 3001]
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+# The latency (in ns) below which an operation is too small to be compared
+DEFAULT_FLOOR = 20000
+REFERENCE_OPERATIONS = 10000
+REFERENCE_REPEATS = 20
+
+UP = [-1, 0]
+RIGHT = [0, 1]
+DOWN = [1, 0]
+LEFT = [0, -1]
+# Going around a 3 x 3 square, the snake never meets an edge or itself
+SQUARE = [UP, UP, RIGHT, RIGHT, DOWN, DOWN, LEFT, LEFT]
+
+
+class Recorder:
+    """
+    Keeps the measurements of a benchmark, and tells it when to stop
+    An operation is measured between 'start' and 'stop'
+    """
+    def __init__(self, max_operations, budget, trace_memory):
+        self._max_operations = max_operations
+        self._budget = budget
+        self._deadline = None   # the budget starts with the first measured operation, after the setup
+        self._trace_memory = trace_memory
+        self._latencies = []
+        self._allocated = 0
+        self._started = 0
+
+    def done(self):
+        return len(self._latencies) >= self._max_operations or \
+            (self._deadline is not None and time.perf_counter() > self._deadline)
+
+    def start(self):
+        if self._deadline is None:
+            self._deadline = time.perf_counter() + self._budget
+        if self._trace_memory:
+            self._allocated -= tracemalloc.get_traced_memory()[0]
+        self._started = time.perf_counter_ns()
+
+    def stop(self):
+        self._latencies.append(time.perf_counter_ns() - self._started)
+        if self._trace_memory:
+            self._allocated += tracemalloc.get_traced_memory()[0]
+
+    def get_latencies(self):
+        return sorted(self._latencies)
+
+    def get_allocated_per_operation(self):
+        return self._allocated / max(1, len(self._latencies))
+
+
+def new_board(dimension, apples, engine):
+    return Board(dimension, apples, engine, random.Random(SEED))
+
+
+def bench_move_plain(dimension, engine, recorder):
+    # No apples, so every move goes through the plain path (the tail is removed)
+    board = new_board(dimension, 0, engine)
+    step = 0
+    while not recorder.done():
+        direction = SQUARE[step % len(SQUARE)]
+        head_x, head_y = board.get_snake_head()
+        recorder.start()
+        board.move(head_x, head_y, direction)
+        recorder.stop()
+        step += 1
+
+
+def bench_move_apple(dimension, engine, recorder):
+    # An apple is put in front of the head before every move, so every move eats it and places a new apple
+    board = new_board(dimension, 0, engine)
+    while not recorder.done():
+        head_x, head_y = board.get_snake_head()
+        if head_x == 0:
+            board = new_board(dimension, 0, engine)
+            head_x, head_y = board.get_snake_head()
+        board.set_cell(head_x - 1, head_y, -1)
+        recorder.start()
+        board.move(head_x, head_y, UP)
+        recorder.stop()
+
+
+def bench_place_apple_empty(dimension, engine, recorder):
+    # The apple is removed after every measurement, so the board stays (nearly) empty
+    board = new_board(dimension, 1, engine)
+    while not recorder.done():
+        recorder.start()
+        row, column = board.place_new_apple()
+        recorder.stop()
+        board.set_cell(row, column, 0)
+
+
+def bench_place_apple_full(dimension, engine, recorder):
+    # The apples are put on every cell where (row + 2 * column) % 5 == 0: no two of them are adjacent, and every other
+    # cell is next to one of them, so only a few cells on the edges are left for a new apple
+    board = new_board(dimension, 0, engine)
+    for row in range(dimension):
+        for column in range((-row * 3) % 5, dimension, 5):
+            if board.get_symbol(row, column) == ' ':
+                board.set_cell(row, column, -1)
+    board.set_cell(0, 0, 0)     # at least the corner is free
+    while not recorder.done():
+        recorder.start()
+        row, column = board.place_new_apple()
+        recorder.stop()
+        board.set_cell(row, column, 0)
+
+
+def bench_initial_apples(dimension, engine, recorder):
+    # Every measurement places another DIM / 2 apples on a new board
+    apples = max(1, dimension // 2)
+    while not recorder.done():
+        board = new_board(dimension, apples, engine)
+        recorder.start()
+        board.set_initial_apples()
+        recorder.stop()
+
+
+def bench_draw(dimension, engine, recorder):
+    # The board is drawn after every move, like the game does (only the changed rows are built again)
+    board = new_board(dimension, dimension // 2, engine)
+    str(board)
+    step = 0
+    while not recorder.done():
+        direction = SQUARE[step % len(SQUARE)]
+        head_x, head_y = board.get_snake_head()
+        try:
+            board.move(head_x, head_y, direction)
+        except BoardError:
+            board = new_board(dimension, dimension // 2, engine)
+            str(board)
+        recorder.start()
+        str(board)
+        recorder.stop()
+        step += 1
+
+
+def bench_move_snake(dimension, engine, recorder):
+    # 'move n' from the middle of the board up to the top edge, on a board without apples
+    steps = dimension // 2 - 1
+    while not recorder.done():
+        service = Service(new_board(dimension, 0, engine))
+        recorder.start()
+        service.move_snake(steps)
+        recorder.stop()
+
+
+BENCHMARKS = {
+    'move_plain': bench_move_plain,
+    'move_apple': bench_move_apple,
+    'place_apple_empty': bench_place_apple_empty,
+    'place_apple_full': bench_place_apple_full,
+    'set_initial_apples': bench_initial_apples,
+    'draw': bench_draw,
+    'move_snake_n': bench_move_snake,
+}
+
+
+def reference_operation(operations=REFERENCE_OPERATIONS):
+    # A fixed piece of work, in plain Python (a dictionary, a list and arithmetic, like the game), timed in every run
+    cells = {}
+    snake = []
+    for operation in range(operations):
+        cell = (operation * 7919) % 1009
+        cells[cell] = cells.get(cell, 0) + 1
+        snake.append(cell)
+        if len(snake) > 16:
+            del cells[snake.pop(0)]
+    return len(cells)
+
+
+def measure_reference(repeats):
+    """
+    Function used to time the reference operation (see 'reference_operation')
+    :param repeats: the number of times it is timed
+    :return: the fastest time, in ns
+    """
+    timings = []
+    for repeat in range(repeats):
+        started = time.perf_counter_ns()
+        reference_operation()
+        timings.append(time.perf_counter_ns() - started)
+    return min(timings)
+
+
+def run_benchmark(benchmark, dimension, engine, max_operations, budget, repeats=1):
+    """
+    Function used to run a benchmark for a board size, in the timing pass (the fastest of 'repeats' runs) and in
+    the memory pass
+    :return: a dictionary with the measurements
+    """
+    latencies = None
+    for repeat in range(repeats):
+        recorder = Recorder(max_operations, budget / repeats, False)
+        benchmark(dimension, engine, recorder)
+        run_latencies = recorder.get_latencies()
+        if latencies is None or run_latencies[len(run_latencies) // 2] < latencies[len(latencies) // 2]:
+            latencies = run_latencies
+
+    tracemalloc.start()
+    memory_recorder = Recorder(min(max_operations, 100), budget, True)
+    benchmark(dimension, engine, memory_recorder)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'operations': len(latencies),
+        'median_ns': latencies[len(latencies) // 2],
+        'p95_ns': latencies[min(len(latencies) - 1, len(latencies) * 95 // 100)],
+        'mean_ns': sum(latencies) / len(latencies),
+        'allocated_bytes_per_op': memory_recorder.get_allocated_per_operation(),
+        'peak_bytes': peak,
+    }
+
+
+def run(dims, names, engine, max_operations, budget, repeats=1):
+    reference = measure_reference(REFERENCE_REPEATS)
+    print('%-20s %29.0f ns' % ('reference', reference))
+    results = {}
+    for name in names:
+        results[name] = {}
+        for dimension in dims:
+            results[name][str(dimension)] = run_benchmark(BENCHMARKS[name], dimension, engine, max_operations, budget,
+                                                          repeats)
+            measurement = results[name][str(dimension)]
+            print('%-20s DIM=%-6d %12.0f ns/op (p95 %12.0f)  %10.0f B/op  peak %12d B' % (
+                name, dimension, measurement['median_ns'], measurement['p95_ns'],
+                measurement['allocated_bytes_per_op'], measurement['peak_bytes']))
+    return {
+        'meta': {'python': platform.python_version(), 'machine': platform.machine(), 'engine': engine,
+                 'seed': SEED, 'reference_ns': reference},
+        'results': results,
+    }
+
+
+def fit_exponent(points):
+    """
+    Function used to fit latency ~ DIM^e over some measurements (least squares on the logarithms)
+    :param points: a list of (DIM, latency) tuples, with at least two different DIMs
+    :return: the exponent e
+    """
+    xs = [math.log(dimension) for dimension, latency in points]
+    ys = [math.log(latency) for dimension, latency in points]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread
+
+
+def compare(report, baseline, tolerance, exponent_tolerance=0.5, floor=DEFAULT_FLOOR):
+    """
+    Function used to compare the results with the baseline
+    :param report: the results of this run
+    :param baseline: the results of the baseline run
+    :param tolerance: how many times slower (than the scaled baseline) a benchmark may get before it is flagged
+    :param exponent_tolerance: how much the fitted exponent of a benchmark may grow before it is flagged
+    :param floor: the latency (in ns) below which an operation isn't compared
+    :return: a list with the descriptions of the regressions
+    """
+    # How many times slower this run's machine is than the baseline's (1 for a baseline without a reference)
+    speed = report['meta'].get('reference_ns', 1) / baseline['meta'].get('reference_ns', report['meta'].get(
+        'reference_ns', 1))
+    regressions = []
+    for name, current in report['results'].items():
+        previous = baseline['results'].get(name, {})
+        dims = sorted((int(dimension) for dimension in current if dimension in previous))
+        compared = []
+        for dimension in dims:
+            latency = current[str(dimension)]['median_ns']
+            expected = previous[str(dimension)]['median_ns'] * speed
+            if latency < floor and expected < floor:
+                continue
+            compared.append(dimension)
+            ratio = latency / max(1, expected)
+            if ratio > tolerance:
+                regressions.append('%s DIM=%d is %.1fx slower than the baseline' % (name, dimension, ratio))
+        if len(compared) > 1:
+            exponent = fit_exponent([(dimension, current[str(dimension)]['median_ns']) for dimension in compared])
+            previous_exponent = fit_exponent([(dimension, previous[str(dimension)]['median_ns'])
+                                              for dimension in compared])
+            if exponent > previous_exponent + exponent_tolerance:
+                regressions.append('%s scales as DIM^%.2f from DIM=%d to DIM=%d, the baseline as DIM^%.2f' % (
+                    name, exponent, compared[0], compared[-1], previous_exponent))
+    return regressions
+
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description='Benchmarks of the snake game across board sizes')
+    parser.add_argument('--dims', type=int, nargs='+', default=DEFAULT_DIMS)
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--engine', default='list', choices=['list', 'numpy', 'auto'])
+    parser.add_argument('--max-operations', type=int, default=2000)
+    parser.add_argument('--budget', type=float, default=1.0, help='seconds spent on each benchmark and size')
+    parser.add_argument('--repeats', type=int, default=3, help='timing passes of each benchmark (the fastest is kept)')
+    parser.add_argument('--output', help='file in which the results are saved as JSON')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='save the results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=2.0)
+    parser.add_argument('--exponent-tolerance', type=float, default=0.5)
+    parser.add_argument('--floor', type=int, default=DEFAULT_FLOOR, help='latency (ns) below which nothing is compared')
+    options = parser.parse_args(arguments)
+
+    report = run(options.dims, options.only, options.engine, options.max_operations, options.budget,
+                 max(1, options.repeats))
+    if options.output:
+        with open(options.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+    if options.save_baseline:
+        with open(options.baseline, 'w') as baseline_file:
+            json.dump(report, baseline_file, indent=2)
+        return 0
+    if not os.path.exists(options.baseline):
+        print('No baseline to compare with (%s)' % options.baseline)
+        return 0
+    with open(options.baseline) as baseline_file:
+        regressions = compare(report, json.load(baseline_file), options.tolerance, options.exponent_tolerance,
+                              options.floor)
+    for regression in regressions:
+        print('REGRESSION: ' + regression)
+    if not regressions:
+        print('No regressions compared to the baseline')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,5 +1,14 @@
 import random
-from texttable import Texttable
+from collections import deque, namedtuple
+from time import perf_counter
+from Entities.engine import create_engine
+from Entities.free_cells import FreeCells
+from Entities.storage import load_game, save_game
+
+
+# The symbol of every value of the matrix, at the position 'value + 1':
+# -1 - apple ('.'), 0 - empty cell (' '), 1 - the snake's head ('+'), 2 - the snake's body ('*')
+SYMBOLS = ('.', ' ', '+', '*')
 
 
 # Basic error class for the Board entity
@@ -12,10 +21,40 @@ class BoardError(Exception):
             return self._message
 
 
+# Error raised when there is no cell left on which an apple can be placed
+class BoardFullError(BoardError):
+    pass
+
+
+def max_apples(rows, columns):
+    """
+    Function to determine how many apples always fit on a new board, whatever cells they are placed on
+    Every apple takes its own cell and blocks at most its four neighbours, so after k apples at least
+    rows * columns - 3 - 5 * k cells (without the snake) are still free, and the next apple has room while that is
+    at least 1. With more apples, placing them may find no room (depending on where the first ones went).
+    :param rows: the number of rows
+    :param columns: the number of columns
+    :return: the number of apples
+    """
+    return max(0, (rows * columns - 4) // 5 + 1)
+
+
+# What 'Board.apply' changed, so 'Board.undo' can take it back:
+#   - direction: the direction of the snake before the move
+#   - head: the new head
+#   - tail: the tail which was removed, or None if the snake ate an apple (so the head's cell was an apple)
+#   - apple: the apple placed after eating, or None
+#   - free_changes: the changes of the index of free cells, in the form of 'FreeCells.set_log'
+#   - random_state: the state of the random number generator before the new apple was placed, or None
+MoveRecord = namedtuple('MoveRecord', ['direction', 'head', 'tail', 'apple', 'free_changes', 'random_state'])
+
+
 '''
 The 'Board' class is a DIM x DIM matrix initialised with 0
 On this matrix, the apples are represented by values of -1, and the snake is represented by natural numbers.
-To be more precise, the snake's head has the value 1, and the rest of the body has the values 2, 3, and so on.
+To be more precise, the snake's head has the value 1, and every other part of the body has the value 2.
+The order of the body parts (from the head to the tail) is kept separately, in the 'self._snake' deque of coordinates,
+so we never have to search the matrix for the head or the tail of the snake.
 
 Example:
     
@@ -46,24 +85,28 @@ Example:
     +---+---+---+---+---+---+---+
     | 0 |-1 | 0 | 2 | 0 | 0 | 0 |
     +---+---+---+---+---+---+---+
-    | 0 | 0 | 0 | 3 |-1 | 0 |-1 |
+    | 0 | 0 | 0 | 2 |-1 | 0 |-1 |
     +---+---+---+---+---+---+---+
     | 0 |-1 | 0 | 0 | 0 | 0 | 0 |
     +---+---+---+---+---+---+---+
     | 0 | 0 | 0 | 0 | 0 | 0 | 0 |
     +---+---+---+---+---+---+---+
     
+    And the snake itself is the deque [(2, 3), (3, 3), (4, 3)] - the head first, the tail last.
+    
     
 The action of moving the snake is quite simple:
     - we change the coordinate of the snake's head based on the direction it's heading
     - we 'drag' the rest of the body after the head, taking into consideration whether the head 'ate' an apple or not
         - if it didn't eat an apple, the 'tail' of the snake is removed (because the snake doesn't grow)
         - if it actually ate an apple, the 'tail' is kept
+Because the middle of the body doesn't change when the snake moves, only (at most) three cells of the matrix are
+updated on each move: the new head, the old head (which becomes a body part) and the old tail.
         
 Example - the snake from above moving one cell up:
 
     +---+---+---+---+---+---+---+   - initial state of the snake
-    |-1 | 0 | 0 | 0 | 0 | 0 |-1 |
+    |-1 | 0 | 0 | 0 | 0 | 0 |-1 |     snake: [(2, 3), (3, 3), (4, 3)]
     +---+---+---+---+---+---+---+
     | 0 |-1 | 0 | 0 | 0 |-1 | 0 |
     +---+---+---+---+---+---+---+
@@ -71,39 +114,23 @@ Example - the snake from above moving one cell up:
     +---+---+---+---+---+---+---+
     | 0 |-1 | 0 | 2 | 0 | 0 | 0 |
     +---+---+---+---+---+---+---+
-    | 0 | 0 | 0 | 3 |-1 | 0 |-1 |
+    | 0 | 0 | 0 | 2 |-1 | 0 |-1 |
     +---+---+---+---+---+---+---+
     | 0 |-1 | 0 | 0 | 0 | 0 | 0 |
     +---+---+---+---+---+---+---+
     | 0 | 0 | 0 | 0 | 0 | 0 | 0 |
     +---+---+---+---+---+---+---+
     
-    +---+---+---+---+---+---+---+   - the head is moved one cell 'up', hence the '1' value from the second row
-    |-1 | 0 | 0 | 0 | 0 | 0 |-1 |  
-    +---+---+---+---+---+---+---+ 
-    | 0 |-1 | 0 | 1 | 0 |-1 | 0 |
-    +---+---+---+---+---+---+---+
-    |-1 | 0 |-1 | 1 | 0 | 0 | 0 |
-    +---+---+---+---+---+---+---+
-    | 0 |-1 | 0 | 2 | 0 | 0 | 0 |
-    +---+---+---+---+---+---+---+
-    | 0 | 0 | 0 | 3 |-1 | 0 |-1 |
-    +---+---+---+---+---+---+---+
-    | 0 |-1 | 0 | 0 | 0 | 0 | 0 |
-    +---+---+---+---+---+---+---+
-    | 0 | 0 | 0 | 0 | 0 | 0 | 0 |
-    +---+---+---+---+---+---+---+
-    
-    +---+---+---+---+---+---+---+   - after the new head is placed correctly, the rest of the body is 'dragged' by 
-    |-1 | 0 | 0 | 0 | 0 | 0 |-1 |     increasing the values bigger than 0 by 1 (because the board is 0, the apples are -1,
-    +---+---+---+---+---+---+---+     the only values bigger than 0 are the snake's body
+    +---+---+---+---+---+---+---+   - the new head is placed one cell 'up' (the '1' value from the second row), and
+    |-1 | 0 | 0 | 0 | 0 | 0 |-1 |     the old head becomes a part of the body (the '2' value from the third row)
+    +---+---+---+---+---+---+---+     snake: [(1, 3), (2, 3), (3, 3), (4, 3)]
     | 0 |-1 | 0 | 1 | 0 |-1 | 0 |
     +---+---+---+---+---+---+---+
     |-1 | 0 |-1 | 2 | 0 | 0 | 0 |
     +---+---+---+---+---+---+---+
-    | 0 |-1 | 0 | 3 | 0 | 0 | 0 |
+    | 0 |-1 | 0 | 2 | 0 | 0 | 0 |
     +---+---+---+---+---+---+---+
-    | 0 | 0 | 0 | 4 |-1 | 0 |-1 |
+    | 0 | 0 | 0 | 2 |-1 | 0 |-1 |
     +---+---+---+---+---+---+---+
     | 0 |-1 | 0 | 0 | 0 | 0 | 0 |
     +---+---+---+---+---+---+---+
@@ -111,13 +138,13 @@ Example - the snake from above moving one cell up:
     +---+---+---+---+---+---+---+
     
     +---+---+---+---+---+---+---+   - knowing that the snake's length doesn't change, because it didn't eat an apple,
-    |-1 | 0 | 0 | 0 | 0 | 0 |-1 |     the values from the board bigger than the snake's length (in this case, the 4 from
-    +---+---+---+---+---+---+---+     the 5th row) are reset to 0, meaning that cell is now empty.
-    | 0 |-1 | 0 | 1 | 0 |-1 | 0 |
-    +---+---+---+---+---+---+---+   - in the case when the snake's head went on an apple, the length of the snake is increased
-    |-1 | 0 |-1 | 2 | 0 | 0 | 0 |     by one, therefore no cell resetting is happening. Moreover, a new random apple is placed
-    +---+---+---+---+---+---+---+     on the board.
-    | 0 |-1 | 0 | 3 | 0 | 0 | 0 |
+    |-1 | 0 | 0 | 0 | 0 | 0 |-1 |     the tail (the last coordinate of the deque, in this case the 2 from the 5th row)
+    +---+---+---+---+---+---+---+     is removed and its cell is reset to 0, meaning that cell is now empty.
+    | 0 |-1 | 0 | 1 | 0 |-1 | 0 |     snake: [(1, 3), (2, 3), (3, 3)]
+    +---+---+---+---+---+---+---+
+    |-1 | 0 |-1 | 2 | 0 | 0 | 0 |   - in the case when the snake's head went on an apple, the length of the snake is increased
+    +---+---+---+---+---+---+---+     by one, therefore the tail is kept. Moreover, a new random apple is placed
+    | 0 |-1 | 0 | 2 | 0 | 0 | 0 |     on the board.
     +---+---+---+---+---+---+---+
     | 0 | 0 | 0 | 0 |-1 | 0 |-1 |
     +---+---+---+---+---+---+---+
@@ -133,48 +160,230 @@ These directions lists of the coordinates X and Y depending on which the snake m
     - down: [1, 0] meaning that the snake moves one row 'down' on the same column (the head's X coordinate is increased by 1)
     - left: [0, -1] meaning that the snake moves on the same row, but one column to the left (the head's Y coordinate is decreased by 1)
     - right: [0, 1] meaning that the snake moves on the same row, but one column to the right (the head's Y coordinate is increased by 1)
+
+The cells on which a new apple can be placed (empty, and without an apple next to them) are kept in the
+'self._free' index (see 'FreeCells'), and 'self._blocked' counts, for every cell, how many apples are next to it.
+Both are updated every time a cell of the matrix changes (in 'set_cell'), so placing an apple never has to
+look through the whole board.
+
+The matrix itself is kept by the board's engine (see 'create_engine'): a list of lists, or a NumPy array when the
+'numpy' engine is chosen ('auto' uses NumPy if it is installed, and the list engine otherwise).
 '''
 class Board:
-    def __init__(self, dimension, apples):
-        self._rows = dimension
-        self._columns = dimension
-        self._apples = apples
-        self._direction = [-1, 0]   # the initial direction of the snake, 'up'
-        self._board = [[0 for col in range(self._columns)] for row in range(self._rows)] #initializing the matrix with 0 values
+    def __init__(self, dimension, apples, engine='list', rng=None, columns=None):
+        """
+        Creates a board with the snake in the middle and the apples on random cells
+        :param dimension: the number of rows (and of columns, when 'columns' isn't given)
+        :param apples: the number of apples
+        :param engine: the engine which keeps the matrix (see 'create_engine')
+        :param rng: the random number generator used to place the apples (None for the 'random' module)
+        :param columns: (optional) the number of columns, for a board which isn't square
+        """
+        self.create_empty_board(dimension, dimension if columns is None else columns, apples, engine, rng)
         self.set_snake()    # calling the function which places our snake on the board
         self.set_initial_apples()   # calling the function that initialises our apples at the start of the game
 
+    def create_empty_board(self, rows, columns, apples, engine, rng):
+        """
+        Function used to set up an empty board (without the snake and the apples)
+        :param rows: the number of rows
+        :param columns: the number of columns
+        :param apples: the number of apples of the game
+        :param engine: the engine which keeps the matrix (see 'create_engine')
+        :param rng: the random number generator used to place the apples (None for the 'random' module)
+        :return: -
+        """
+        self._rows = rows
+        self._columns = columns
+        self._apples = apples
+        self._random = rng if rng is not None else random  # where the apples' places come from (e.g. a seeded random.Random)
+        self._direction = [-1, 0]   # the initial direction of the snake, 'up'
+        self._engine = create_engine(engine, SYMBOLS)
+        self._board = self._engine.create_matrix(self._rows, self._columns) #initializing the matrix with 0 values
+        self._snake = deque()   # the coordinates of the snake's body parts, from the head to the tail
+        size = self._rows * self._columns
+        self._free = FreeCells(size, self._engine.create_cell_array(size))    # the cells on which an apple can be placed
+        self._blocked = bytearray(self._rows * self._columns)   # the number of apples next to each cell
+        self._changed_cells = None  # the cells changed since the last call of 'pop_changed_cells', if anyone asks
+        self._border = '+' + '---+' * self._columns    # the line drawn between the rows of the board
+        self._row_strings = [None] * self._rows     # the text of every row, None if it has to be built again
+        self._stats = None  # the Stats in which the moves are measured, None if they aren't measured
+        self._apple_cells = set()   # the coordinates of the apples
+
+    @classmethod
+    def from_state(cls, rows, columns, apples, direction, snake, apple_cells, free_cells=None, rng=None,
+                   engine='list'):
+        """
+        Function used to build a board in a given state (e.g. a saved one)
+        :param rows: the number of rows
+        :param columns: the number of columns
+        :param apples: the number of apples of the game
+        :param direction: the direction of the snake
+        :param snake: the coordinates of the snake's body parts, from the head to the tail
+        :param apple_cells: the coordinates of the apples
+        :param free_cells: (optional) the cells of the index of free cells, in their exact order; when they are given,
+                           the next apples are placed exactly where they would have been placed on the original board
+        :param rng: the random number generator used to place the apples (None for the 'random' module)
+        :param engine: the engine which keeps the matrix (see 'create_engine')
+        :return: the new Board
+        """
+        board = cls.__new__(cls)
+        board.create_empty_board(rows, columns, apples, engine, rng)
+        board.set_direction(list(direction))
+        for index, (row, column) in enumerate(snake):
+            board.set_cell(row, column, 1 if index == 0 else 2)
+        board._snake = deque(snake)
+        for row, column in apple_cells:
+            board.set_cell(row, column, -1)
+        if free_cells is not None:
+            board._free = FreeCells.from_cells(rows * columns, free_cells)
+        return board
+
+    @classmethod
+    def from_file(cls, path, engine='list', rng=None):
+        """
+        Function used to build a board from a saved game (see 'save')
+        The file is memory-mapped, so only its header, the snake and the parts of the grid with apples are read
+        :param path: the path of the saved game
+        :param engine: the engine which keeps the matrix (see 'create_engine')
+        :param rng: the random number generator used to place the apples (None for the 'random' module)
+        :return: the new Board
+        """
+        game = load_game(path)
+        return cls.from_state(game['rows'], game['columns'], len(game['apples']), game['direction'], game['snake'],
+                              game['apples'], rng=rng, engine=engine)
+
+    def save(self, path):
+        """
+        Function used to save the board to a file, in the compact format of 'Entities.storage'
+        :param path: the path of the file
+        :return: -
+        """
+        save_game(self, path)
+
     def get_direction(self):
         return self._direction
 
+    # The number of rows and columns of the board
+    def get_dimensions(self):
+        return self._rows, self._columns
+
+    # The number of apples the game started with
+    def get_apple_count(self):
+        return self._apples
+
     # This function is used when the snake's direction changes, setting the new direction
     def set_direction(self, new_direction):
         self._direction = new_direction
 
+    # The coordinates of the snake's body parts, from the head to the tail (this deque must not be changed)
+    def get_snake(self):
+        return self._snake
+
+    # The coordinates of the apples on the board (this set must not be changed)
+    def get_apples(self):
+        return self._apple_cells
+
+    # The cells on which an apple can be placed, in the order of the index of free cells
+    def get_free_cells(self):
+        return self._free.get_cells()
+
+    # The positions of the index of free cells which change from now on are added to this set (None to stop it)
+    def watch_free_cells(self, positions):
+        self._free.set_watch(positions)
+
+    # The random number generator used to place the apples
+    def get_random(self):
+        return self._random
+
+    # True if the board only keeps the cells which aren't empty (see 'SparseBoard'), False if it keeps the matrix
+    def is_sparse(self):
+        return False
+
+    # This function is used to turn the measuring of the moves on (with a Stats object) or off (with None)
+    def set_stats(self, stats):
+        self._stats = stats
+
+    def set_cell(self, row, column, value, update_free=True):
+        """
+        Function used to change the value of a cell, keeping the index of the free cells up to date
+        :param row: the row of the cell
+        :param column: the column of the cell
+        :param value: the new value of the cell (0 - empty, -1 - apple, 1 - head, 2 - body)
+        :param update_free: False when the index of free cells is brought back some other way (see 'undo')
+        :return: -
+        """
+        old_value = self._board[row][column]
+        self._board[row][column] = value
+        self._row_strings[row] = None
+        if self._changed_cells is not None:
+            self._changed_cells.add((row, column))
+        if old_value == -1 or value == -1:
+            # An apple appears or disappears, so the cells next to it are blocked or released
+            if value == -1:
+                change = 1
+                self._apple_cells.add((row, column))
+            else:
+                change = -1
+                self._apple_cells.discard((row, column))
+            for next_row, next_column in ((row - 1, column), (row + 1, column), (row, column - 1), (row, column + 1)):
+                if 0 <= next_row < self._rows and 0 <= next_column < self._columns:
+                    cell = next_row * self._columns + next_column
+                    self._blocked[cell] += change
+                    if not update_free:
+                        continue
+                    if self._blocked[cell] == 0 and self._board[next_row][next_column] == 0:
+                        self._free.add(cell)
+                    else:
+                        self._free.discard(cell)
+        if not update_free:
+            return
+        cell = row * self._columns + column
+        if value == 0 and self._blocked[cell] == 0:
+            self._free.add(cell)
+        else:
+            self._free.discard(cell)
+
+    def get_symbol(self, row, column):
+        """
+        Function to determine how a cell is displayed
+        :param row: the row of the cell
+        :param column: the column of the cell
+        :return: ' ' for an empty cell, '.' for an apple, '+' for the head and '*' for the body of the snake
+        """
+        return SYMBOLS[self._board[row][column] + 1]
+
+    def track_changes(self):
+        """
+        Function used to start recording which cells change, so they can be redrawn without drawing the whole board
+        :return: -
+        """
+        self._changed_cells = set()
+
+    def pop_changed_cells(self):
+        """
+        Function to get the cells changed since the last call (tracking has to be started with 'track_changes')
+        :return: a set with the coordinates of the changed cells
+        """
+        changed_cells = self._changed_cells
+        self._changed_cells = set()
+        return changed_cells
+
     def get_snake_head(self):
         """
         Function to determine the coordinates of the snake's head on the board
         :return: tuple of the coordinates
-        The snake's head is represented by the value '1' from the board
+        The snake's head is the first element of the snake's deque
         """
-        for row in range(self._rows):
-            for column in range(self._columns):
-                if self._board[row][column] == 1:
-                    return row, column
+        return self._snake[0]
 
     def long_snake(self):
         """
         Function to determine the length of the snake
         :return: Snake's length
         """
-        # The snake-s length is equal to the biggest value present on the board
-        # Example: 4 | 3 | 2 | 1 | 0 snake has length 4
-        snake_length = 0
-        for row in range(self._rows):
-            for column in range(self._columns):
-                if self._board[row][column] > snake_length:
-                    snake_length = self._board[row][column]
-        return snake_length
+        # The snake's length is equal to the number of body parts kept in the deque
+        return len(self._snake)
 
     def check_bounds(self, head_x, head_y):
         """
@@ -200,6 +409,8 @@ class Board:
         :param direction: a list with the coordinates which signal the direction in which the snake moves
         :return: -
         """
+        if self._stats is not None:
+            return self.move_with_stats(initial_x, initial_y, direction)
         # direction list is of type [x-direction, y-direction]
         x_axis = direction[0]
         y_axis = direction[1]
@@ -213,9 +424,222 @@ class Board:
             self.move_snake_apple(new_head_x, new_head_y)
             self.place_new_apple()
         else:
-            length_of_snake = self.long_snake()
+            length_of_snake = len(self._snake)
             self.move_snake_simple(new_head_x, new_head_y, length_of_snake)
 
+    def move_with_stats(self, initial_x, initial_y, direction):
+        """
+        Function which does the same as 'move', but also measures how long every phase of the move takes
+        (the bounds check, the update of the body, the removal of the tail and the placement of a new apple)
+        :param initial_x: initial x-coordinate of the snake's head
+        :param initial_y: initial y-coordinate of the snake's head
+        :param direction: a list with the coordinates which signal the direction in which the snake moves
+        :return: -
+        """
+        stats = self._stats
+        started = perf_counter()
+        new_head_x = initial_x + direction[0]
+        new_head_y = initial_y + direction[1]
+        in_bounds = self.check_bounds(new_head_x, new_head_y)
+        checked = perf_counter()
+        stats.add_time('bounds_check', checked - started)
+        if in_bounds is False:
+            raise BoardError("Snake game ended! It hit an edge or itself")
+        if self._board[new_head_x][new_head_y] == -1:
+            self.add_head(new_head_x, new_head_y)
+            updated = perf_counter()
+            stats.add_time('body_update', updated - checked)
+            self.place_new_apple()
+            finished = perf_counter()
+            stats.add_time('apple_placement', finished - updated)
+            stats.count('apples_placed')
+        else:
+            self.remove_tail()
+            cleared = perf_counter()
+            stats.add_time('tail_clear', cleared - checked)
+            self.add_head(new_head_x, new_head_y)
+            finished = perf_counter()
+            stats.add_time('body_update', finished - cleared)
+        stats.add_time('board_move', finished - started)
+
+    def apply(self, direction):
+        """
+        Function used to move the snake one cell in a direction, in a way that can be taken back with 'undo'
+        Either the whole move is made, or (when the snake hits something, or there is no room for a new apple)
+        nothing changes and a BoardError is raised
+        :param direction: a list with the coordinates which signal the direction in which the snake moves
+        :return: the MoveRecord of the move
+        """
+        head_x, head_y = self._snake[0]
+        new_head_x = head_x + direction[0]
+        new_head_y = head_y + direction[1]
+        if self.check_bounds(new_head_x, new_head_y) is False:
+            raise BoardError("Snake game ended! It hit an edge or itself")
+        free_changes = []
+        if self._free is not None:
+            self._free.set_log(free_changes)
+        try:
+            if self._board[new_head_x][new_head_y] == -1:
+                random_state = self._random.getstate()
+                self.add_head(new_head_x, new_head_y)
+                record = MoveRecord(self._direction, (new_head_x, new_head_y), None, None, free_changes,
+                                    random_state)
+                try:
+                    apple = self.place_new_apple()
+                except BoardFullError:
+                    self.undo(record)
+                    raise
+                record = record._replace(apple=apple)
+            else:
+                record = MoveRecord(self._direction, (new_head_x, new_head_y), self._snake[-1], None, free_changes,
+                                    None)
+                self.remove_tail()
+                self.add_head(new_head_x, new_head_y)
+        finally:
+            if self._free is not None:
+                self._free.set_log(None)
+        self._direction = list(direction)
+        return record
+
+    def undo(self, record):
+        """
+        Function used to take back a move made with 'apply', leaving the board exactly as it was before it
+        (the index of free cells in the same order, and the random number generator in the same state)
+        The moves have to be taken back in the reverse order in which they were made
+        :param record: the MoveRecord returned by 'apply'
+        :return: -
+        """
+        if self._free is not None:
+            self._free.revert(record.free_changes)
+        if record.apple is not None:
+            self.set_cell(record.apple[0], record.apple[1], 0, False)
+        self._snake.popleft()
+        self.set_cell(record.head[0], record.head[1], -1 if record.tail is None else 0, False)
+        old_head_x, old_head_y = self._snake[0]
+        self.set_cell(old_head_x, old_head_y, 1, False)
+        if record.tail is not None:
+            self._snake.append(record.tail)
+            self.set_cell(record.tail[0], record.tail[1], 2, False)
+        if record.random_state is not None:
+            self._random.setstate(record.random_state)
+        self._direction = record.direction
+
+    def count_steps_to_edge(self, direction, steps):
+        """
+        Function to determine how many steps the snake's head can make in a direction before it reaches an edge
+        :param direction: a list with the coordinates which signal the direction in which the snake moves
+        :param steps: the maximum number of steps we look ahead
+        :return: the number of steps (at most 'steps') which stay on the board
+        """
+        head_x, head_y = self._snake[0]
+        if direction[0] == 1:
+            return min(steps, self._rows - 1 - head_x)
+        if direction[0] == -1:
+            return min(steps, head_x)
+        if direction[1] == 1:
+            return min(steps, self._columns - 1 - head_y)
+        return min(steps, head_y)
+
+    def count_free_steps(self, direction, steps):
+        """
+        Function to determine how many steps the snake can make in a straight line before something happens
+        (it meets an apple, an edge or its own body)
+        :param direction: a list with the coordinates which signal the direction in which the snake moves
+        :param steps: the maximum number of steps we look ahead
+        :return: the number of steps (at most 'steps') which don't need any check
+        """
+        x_axis = direction[0]
+        y_axis = direction[1]
+        head_x, head_y = self._snake[0]
+        # The edge of the board limits how far we have to look
+        steps = self.count_steps_to_edge(direction, steps)
+        # While the head goes forward, the tail leaves one cell at every step, so a body part in front of the head
+        # is only a problem if it's still there when the head reaches it
+        left_cells = set()
+        tail = reversed(self._snake)
+        for step in range(1, steps + 1):
+            cell_x = head_x + step * x_axis
+            cell_y = head_y + step * y_axis
+            value = self._board[cell_x][cell_y]
+            if value == -1 or (value > 0 and (cell_x, cell_y) not in left_cells):
+                return step - 1
+            left_cells.add(next(tail, None))
+        return steps
+
+    def move_straight(self, direction, steps):
+        """
+        Function used to move the snake a number of steps in the same direction
+        The steps in which nothing happens are made without any checks, and only the steps in which the snake meets
+        an apple, an edge or its own body go through 'move', so the end result is the same as moving step by step
+        :param direction: a list with the coordinates which signal the direction in which the snake moves
+        :param steps: the number of cells the snake moves over
+        :return: -
+        """
+        stats = self._stats
+        while steps > 0:
+            if stats is not None:
+                started = perf_counter()
+            free_steps = self.count_free_steps(direction, steps)
+            if stats is not None:
+                looked = perf_counter()
+                stats.add_time('look_ahead', looked - started)
+            self.make_free_steps(direction, free_steps)
+            if stats is not None:
+                stats.add_time('free_steps', perf_counter() - looked)
+                stats.count('unchecked_steps', free_steps)
+            steps -= free_steps
+            if steps > 0:
+                # Something happens on this step, so we let 'move' handle it (it may also end the game)
+                if stats is not None:
+                    started = perf_counter()
+                head_x, head_y = self.get_snake_head()
+                if stats is not None:
+                    stats.add_time('head_lookup', perf_counter() - started)
+                self.move(head_x, head_y, direction)
+                steps -= 1
+
+    def make_free_steps(self, direction, steps):
+        """
+        Function used to move the snake a number of steps in which it doesn't meet anything (see 'count_free_steps'),
+        without any checks
+        :param direction: a list with the coordinates which signal the direction in which the snake moves
+        :param steps: the number of steps
+        :return: -
+        """
+        if steps == 0:
+            return
+        x_axis = direction[0]
+        y_axis = direction[1]
+        board = self._board
+        snake = self._snake
+        free = self._free
+        changed_cells = self._changed_cells
+        row_strings = self._row_strings
+        head_x, head_y = snake[0]
+        board[head_x][head_y] = 2
+        row_strings[head_x] = None
+        if changed_cells is not None:
+            changed_cells.add((head_x, head_y))
+        # The same cells are freed and taken, in the same order, as when moving step by step,
+        # so the index of free cells (and the next apple) ends up exactly the same
+        for step in range(steps):
+            tail_x, tail_y = snake.pop()
+            board[tail_x][tail_y] = 0
+            row_strings[tail_x] = None
+            cell = tail_x * self._columns + tail_y
+            if self._blocked[cell] == 0:
+                free.add(cell)
+            head_x += x_axis
+            head_y += y_axis
+            board[head_x][head_y] = 2
+            row_strings[head_x] = None
+            free.discard(head_x * self._columns + head_y)
+            snake.appendleft((head_x, head_y))
+            if changed_cells is not None:
+                changed_cells.add((tail_x, tail_y))
+                changed_cells.add((head_x, head_y))
+        board[head_x][head_y] = 1
+
     def move_snake_apple(self, head_x, head_y):
         """
         Function used to move the snake in the case it has met an apple
@@ -224,95 +648,76 @@ class Board:
         :return: -
         """
         # In this case, the length of the snake increases, so we don't need to remove the 'extra' body part
-        self._board[head_x][head_y] = 1
-        for row in range(self._rows):
-            for column in range(self._columns):
-                if self._board[row][column] >= 1 and (row != head_x or column != head_y):
-                    self._board[row][column] += 1
+        self.add_head(head_x, head_y)
 
     def move_snake_simple(self, head_x, head_y, snake_length):
         """
         Function to move the snake in the case it hasn't met an apple an apple
         :param head_x: x-coordinate of the head
         :param head_y: y-coordinate of the head
-        :param snake_length: the length of the snake
+        :param snake_length: the length of the snake (kept for compatibility, the deque already knows it)
         :return: -
         """
-        # We firstly place the snake's head
-        self._board[head_x][head_y] = 1
+        # We firstly remove the tail, because the length of the snake doesn't change
+        self.remove_tail()
+        # Then we place the snake's new head
+        self.add_head(head_x, head_y)
+
+    def add_head(self, head_x, head_y):
         """
-        # We 'update' the body of the snake
-        Example: 3 | 2 | 1 | 0  --> 0 | 3 | 2 | 1
+        Function used to place the snake's new head, the old head becoming a part of the body
+        :param head_x: x-coordinate of the new head
+        :param head_y: y-coordinate of the new head
+        :return: -
         """
-        for row in range(self._rows):
-            for column in range(self._columns):
-                if self._board[row][column] >= 1 and (row != head_x or column != head_y):
-                    self._board[row][column] += 1
+        old_head_x, old_head_y = self._snake[0]
+        self.set_cell(old_head_x, old_head_y, 2)
+        self.set_cell(head_x, head_y, 1)
+        self._snake.appendleft((head_x, head_y))
 
-        # After updating, we'll have an extra part of the snake (of value len+1), which needs to be removed
-        for row in range(self._rows):
-            for column in range(self._columns):
-                if self._board[row][column] == snake_length + 1:
-                    self._board[row][column] = 0
+    def remove_tail(self):
+        """
+        Function used to remove the last part of the snake's body, emptying its cell
+        :return: -
+        """
+        tail_x, tail_y = self._snake.pop()
+        self.set_cell(tail_x, tail_y, 0)
 
     def place_new_apple(self):
         """
         Function used to set a new apple on the board after one's been eaten by the snake
-        Works the same way as the initial setting, but placing only one apple
-        :return:
+        The apple is placed on a random cell from the index of free cells, which only holds empty cells
+        that have no adjacent apples
+        :return: the coordinates of the new apple
         """
-        # We get all the possible coordinates on which an apple can be placed on the board
-        field = []
-        for row in range(self._rows):
-            for column in range(self._columns):
-                if self._board[row][column] == 0: # if a cell is 0, it means it's empty (this way we can avoid overlapping the snake)
-                    field.append((row, column))
-        apples = 1
-        while apples > 0:
-            # We get a random location, check if it has adjacent apples and place an apple if we can
-            location = random.choice(field)
-            row = location[0]
-            column = location[1]
-            field.remove(location)
-            if self.adjacent_apples(row, column) is False:
-                self._board[row][column] = -1  # -1 on the board means it's an apple
-                apples -= 1
+        if len(self._free) == 0:
+            raise BoardFullError("There is no room left on the board for a new apple!")
+        row, column = divmod(self._free.sample(self._random), self._columns)
+        self.set_cell(row, column, -1)  # -1 on the board means it's an apple
+        return row, column
 
     def set_snake(self):
         """
         Putting the snake in the middle of the board
         1 - represents the head of the snake
-        2, 3, ... - represent the body parts of the snake and implicitly its length
+        2 - represents the body parts of the snake
         :return:
         """
         middle_row = self._rows // 2
         middle_col = self._columns // 2
-        self._board[middle_row][middle_col] = 2  # 2, 3, .. means the body of the snake
-        self._board[middle_row + 1][middle_col] = 3
-        self._board[middle_row - 1][middle_col] = 1  # 1 means the head of the snake
+        self.set_cell(middle_row, middle_col, 2)  # 2 means the body of the snake
+        self.set_cell(middle_row + 1, middle_col, 2)
+        self.set_cell(middle_row - 1, middle_col, 1)  # 1 means the head of the snake
+        self._snake = deque([(middle_row - 1, middle_col), (middle_row, middle_col), (middle_row + 1, middle_col)])
 
     def set_initial_apples(self):
         """
         Function used to set the initial apples
         :return:
         """
-        # We get all the possible coordinates on which an apple can be placed on the board
-        field = []
-        for row in range(self._rows):
-            for column in range(self._columns):
-                if self._board[row][column] == 0:  # if a cell is 0, it means it's empty (this way we can avoid overlapping the snake)
-                    field.append((row, column))
-
-        apples = self._apples
-        while apples > 0:
-            # We get a random location, check if it has adjacent apples and place an apple if we can
-            location = random.choice(field)
-            row = location[0]
-            column = location[1]
-            field.remove(location)
-            if self.adjacent_apples(row, column) is False:
-                self._board[row][column] = -1  # -1 on the board means it's an apple
-                apples -= 1
+        # Every apple is placed the same way as a new one, raising a BoardFullError if they don't fit on the board
+        for apple in range(self._apples):
+            self.place_new_apple()
 
     def adjacent_apples(self, row, column):
         """
@@ -336,18 +741,18 @@ class Board:
         return False
 
     def __str__(self):
-        t = Texttable()
-        # Add each table row
-        for row in range(0, self._rows):
-            data = []
-            for val in self._board[row][:]:
-                if val == 0:
-                    data.append(' ')
-                elif val == -1:
-                    data.append('.')
-                elif val == 1:
-                    data.append('+')
-                elif val > 1:
-                    data.append("*")
-            t.add_row(data)
-        return t.draw()
+        """
+        The board is drawn as a table, with a border line between every two rows:
+            +---+---+---+
+            |   | . |   |
+            +---+---+---+
+            | + | * |   |
+            +---+---+---+
+        The text of every row is kept until one of its cells changes, so only the changed rows are built again
+        """
+        row_strings = self._row_strings
+        for row in range(self._rows):
+            if row_strings[row] is None:
+                row_strings[row] = self._engine.draw_row(self._board[row])
+        border = '\n' + self._border + '\n'
+        return self._border + '\n' + border.join(row_strings) + '\n' + self._border
@@ -0,0 +1,92 @@
+import importlib
+from array import array
+
+# NumPy is imported (by 'load_numpy') only when a board asks for it, so starting the game doesn't wait for it
+numpy = None
+
+
+'''
+The engines decide how the matrix of the board is stored, and do the operations which go over a whole row of it.
+Both of them are used in the same way by the Board (a cell is always 'matrix[row][column]'), so a game plays exactly
+the same whichever engine is chosen:
+    - 'ListEngine' keeps the matrix as a list of lists of Python ints (it needs nothing besides Python itself)
+    - 'NumpyEngine' keeps the matrix as a DIM x DIM NumPy array of int32 values, which takes a lot less memory on big
+      boards, is allocated at once, and draws a whole row with a single lookup in an array of symbols
+The engines also build the array with all the cells of the board (0, 1, 2, ...) from which the index of free cells
+starts, which the NumPy engine does in one go instead of counting the cells one by one.
+'''
+class ListEngine:
+    name = 'list'
+
+    def __init__(self, symbols):
+        self._symbols = symbols
+
+    def create_matrix(self, rows, columns):
+        return [[0] * columns for row in range(rows)]
+
+    def create_cell_array(self, size):
+        return array('l', range(size))
+
+    def draw_row(self, values):
+        """
+        Function to build the text of a row of the board
+        :param values: the values of the cells of the row
+        :return: a string like '| + | * |   |'
+        """
+        symbols = self._symbols
+        return '| ' + ' | '.join([symbols[value + 1] for value in values]) + ' |'
+
+
+class NumpyEngine:
+    name = 'numpy'
+
+    def __init__(self, symbols):
+        self._symbols = numpy.array(symbols)
+
+    def create_matrix(self, rows, columns):
+        return numpy.zeros((rows, columns), dtype=numpy.int32)
+
+    def create_cell_array(self, size):
+        cells = array('l')
+        cells.frombytes(numpy.arange(size, dtype=cells.typecode).tobytes())
+        return cells
+
+    def draw_row(self, values):
+        """
+        Function to build the text of a row of the board
+        :param values: the values of the cells of the row (a NumPy array)
+        :return: a string like '| + | * |   |'
+        """
+        return '| ' + ' | '.join(self._symbols[values + 1].tolist()) + ' |'
+
+
+def load_numpy():
+    """
+    Function used to import NumPy the first time it is needed
+    :return: True if NumPy is installed, False otherwise
+    """
+    global numpy
+    if numpy is None:
+        try:
+            numpy = importlib.import_module('numpy')
+        except ImportError:
+            return False
+    return True
+
+
+def create_engine(name, symbols):
+    """
+    Function used to choose the engine of a board
+    :param name: 'list', 'numpy', or 'auto' (NumPy if it is installed, the list engine otherwise)
+    :param symbols: the symbol of every value of the matrix, at the position 'value + 1'
+    :return: the engine
+    """
+    if name == 'auto':
+        name = 'numpy' if load_numpy() else 'list'
+    if name == 'list':
+        return ListEngine(symbols)
+    elif name == 'numpy':
+        if not load_numpy():
+            raise ImportError("The 'numpy' engine needs NumPy to be installed!")
+        return NumpyEngine(symbols)
+    raise ValueError("Engine non existent: " + str(name))
@@ -0,0 +1,152 @@
+import random
+from array import array
+
+
+'''
+The 'FreeCells' class is the index of the cells on which a new apple can be placed.
+A cell is identified by a single number, 'row * columns + column', so the index can be kept in two compact arrays:
+    - 'self._cells' holds the free cells, in no particular order
+    - 'self._position' tells, for every cell of the board, where it is in 'self._cells' (or -1 if it isn't free)
+
+Adding a cell appends it to 'self._cells'. Removing a cell moves the last free cell in its place, so both operations,
+as well as picking a random free cell, take constant time.
+
+When a log is given (with 'set_log'), every change of the index is also written in it, so the changes can be taken
+back later in the reverse order ('revert'), leaving the index exactly as it was, in the same order:
+    - adding the cell c writes c
+    - removing the cell c from the position p writes p, then -1 - c
+
+When a set of positions is watched (with 'set_watch'), the positions of 'self._cells' which get another cell are
+added to it, so the index can be saved by writing only what changed since it was last saved (see 'Service.journal').
+
+Example (a board with 6 cells, where the cells 1 and 4 are not free):
+    cells:    [0, 5, 2, 3]
+    position: [0, -1, 2, 3, -1, 1]
+
+    After removing the cell 0, the last free cell (3) takes its place:
+    cells:    [3, 5, 2]
+    position: [-1, -1, 2, 0, -1, 1]
+'''
+class FreeCells:
+    def __init__(self, size, all_cells=None):
+        """
+        At the start, every cell of the board is free
+        :param size: the number of cells of the board
+        :param all_cells: (optional) an array('l') with every cell of the board, in order, if one is already built
+        """
+        self._cells = all_cells if all_cells is not None else array('l', range(size))
+        self._position = array('l', self._cells)   # every cell is at its own position
+        self._log = None    # the list in which the changes are written, None if they aren't
+        self._watch = None  # the set in which the changed positions are gathered, None if they aren't
+
+    @classmethod
+    def from_cells(cls, size, cells):
+        """
+        Function used to build the index from the free cells, keeping their order
+        :param size: the number of cells of the board
+        :param cells: the free cells
+        :return: the new index
+        """
+        free_cells = cls.__new__(cls)
+        free_cells._cells = array('l', cells)
+        free_cells._position = array('l', [-1]) * size
+        for position, cell in enumerate(free_cells._cells):
+            free_cells._position[cell] = position
+        free_cells._log = None
+        free_cells._watch = None
+        return free_cells
+
+    def __len__(self):
+        return len(self._cells)
+
+    def __contains__(self, cell):
+        return self._position[cell] != -1
+
+    def add(self, cell):
+        """
+        Function used to mark a cell as free
+        :param cell: the number of the cell
+        :return: -
+        """
+        if self._position[cell] == -1:
+            self._position[cell] = len(self._cells)
+            self._cells.append(cell)
+            if self._log is not None:
+                self._log.append(cell)
+            if self._watch is not None:
+                self._watch.add(self._position[cell])
+
+    def discard(self, cell):
+        """
+        Function used to mark a cell as taken (nothing happens if the cell isn't free)
+        :param cell: the number of the cell
+        :return: -
+        """
+        position = self._position[cell]
+        if position != -1:
+            last_cell = self._cells.pop()
+            if last_cell != cell:
+                # The last free cell fills the gap left by the removed one
+                self._cells[position] = last_cell
+                self._position[last_cell] = position
+                if self._watch is not None:
+                    self._watch.add(position)
+            self._position[cell] = -1
+            if self._log is not None:
+                self._log.append(position)
+                self._log.append(-1 - cell)
+
+    # This function is used to start writing the changes in a list, or to stop it (with None)
+    def set_log(self, log):
+        self._log = log
+
+    # This function is used to start gathering the changed positions in a set, or to stop it (with None)
+    def set_watch(self, positions):
+        self._watch = positions
+
+    def revert(self, log):
+        """
+        Function used to take back the changes written in a log, from the last one to the first one
+        :param log: the list with the changes (see 'set_log')
+        :return: -
+        """
+        cells = self._cells
+        positions = self._position
+        watch = self._watch
+        index = len(log) - 1
+        while index >= 0:
+            entry = log[index]
+            if entry >= 0:
+                # The cell was added at the end, so it is still the last one
+                cells.pop()
+                positions[entry] = -1
+                index -= 1
+            else:
+                # The cell goes back to its position, and the cell which took its place goes back to the end
+                cell = -1 - entry
+                position = log[index - 1]
+                if position == len(cells):
+                    cells.append(cell)
+                else:
+                    moved_cell = cells[position]
+                    positions[moved_cell] = len(cells)
+                    if watch is not None:
+                        watch.add(len(cells))
+                    cells.append(moved_cell)
+                    cells[position] = cell
+                positions[cell] = position
+                if watch is not None:
+                    watch.add(position)
+                index -= 2
+
+    # The free cells, in their order (this array must not be changed)
+    def get_cells(self):
+        return self._cells
+
+    def sample(self, rng=random):
+        """
+        Function used to pick a random free cell
+        :param rng: the random number generator used (by default, the 'random' module)
+        :return: the number of the cell
+        """
+        return self._cells[rng.randrange(len(self._cells))]
@@ -0,0 +1,232 @@
+import random
+from Entities.board import Board, BoardFullError, SYMBOLS
+
+
+'''
+The 'SparseBoard' plays exactly like the 'Board', but it only keeps the cells which aren't empty: the snake and the
+apples, in a dictionary {(row, column): value} with the same values as the matrix (-1 apple, 1 head, 2 body).
+Its memory only depends on the length of the snake and on the number of apples, and creating it takes the same time
+for any size, so it can hold boards with millions of rows and columns, as long as they are mostly empty.
+
+The dictionary is seen by the methods of the Board as if it was the matrix ('SparseMatrix'), so the rules of the game
+(moving, eating, hitting an edge or the body) are the same code for both boards.
+What can't work without the matrix is done differently:
+    - there is no index of free cells: a new apple goes on a random cell of the whole board, drawn again until it is
+      empty and has no apple next to it (rejection sampling); on a mostly empty board, the first draw nearly always
+      fits, and when MAX_ATTEMPTS draws in a row didn't, the free cells are counted by going over the board
+      (with stats turned on, every draw which didn't fit is counted as 'apple_rejections')
+    - the rows of the board aren't kept as text, so drawing the board builds all of them every time
+    - a long move in a straight line only looks at the apples and the body in front of the head, and only moves the
+      cells the snake ends on ('count_free_steps', 'make_free_steps'), so its time doesn't depend on its length
+The apples are placed in other cells than on a Board with the same seed, but with the same rules.
+'''
+MAX_ATTEMPTS = 64
+
+
+class SparseRow:
+    __slots__ = ('_cells', '_row')
+
+    def __init__(self, cells, row):
+        self._cells = cells
+        self._row = row
+
+    def __getitem__(self, column):
+        return self._cells.get((self._row, column), 0)
+
+    def __setitem__(self, column, value):
+        if value == 0:
+            self._cells.pop((self._row, column), None)
+        else:
+            self._cells[(self._row, column)] = value
+
+
+class SparseMatrix:
+    """
+    A view of the dictionary of cells, which can be read and written like a matrix: 'matrix[row][column]'
+    """
+    __slots__ = ('_cells',)
+
+    def __init__(self, cells):
+        self._cells = cells
+
+    def __getitem__(self, row):
+        return SparseRow(self._cells, row)
+
+
+class SparseBoard(Board):
+    def create_empty_board(self, rows, columns, apples, engine, rng):
+        """
+        Function used to set up an empty board (without the snake and the apples)
+        :param rows: the number of rows
+        :param columns: the number of columns
+        :param apples: the number of apples of the game
+        :param engine: not used, the sparse board has no matrix (the parameter is kept so it can replace a Board)
+        :param rng: the random number generator used to place the apples (None for the 'random' module)
+        :return: -
+        """
+        self._rows = rows
+        self._columns = columns
+        self._apples = apples
+        self._random = rng if rng is not None else random
+        self._direction = [-1, 0]
+        self._cells = {}    # the cells which aren't empty, with their values
+        self._board = SparseMatrix(self._cells)
+        self._free = None   # there is no index of free cells
+        self._snake = None
+        self._changed_cells = None
+        self._stats = None
+        self._apple_cells = set()
+
+    @classmethod
+    def from_state(cls, rows, columns, apples, direction, snake, apple_cells, free_cells=None, rng=None,
+                   engine='list'):
+        """
+        Function used to build a board in a given state (see 'Board.from_state')
+        There is no index of free cells, so 'free_cells' is ignored
+        """
+        return super().from_state(rows, columns, apples, direction, snake, apple_cells, None, rng, engine)
+
+    def is_sparse(self):
+        return True
+
+    def get_free_cells(self):
+        """
+        Function to get the cells on which an apple can be placed
+        There is no index of them, so this goes over the whole board
+        :return: a generator of the numbers of the cells (row * columns + column)
+        """
+        for row in range(self._rows):
+            for column in range(self._columns):
+                if self.can_hold_apple(row, column):
+                    yield row * self._columns + column
+
+    def can_hold_apple(self, row, column):
+        cells = self._cells
+        return (row, column) not in cells and (row - 1, column) not in self._apple_cells and \
+            (row + 1, column) not in self._apple_cells and (row, column - 1) not in self._apple_cells and \
+            (row, column + 1) not in self._apple_cells
+
+    def set_cell(self, row, column, value, update_free=True):
+        """
+        Function used to change the value of a cell
+        :param row: the row of the cell
+        :param column: the column of the cell
+        :param value: the new value of the cell (0 - empty, -1 - apple, 1 - head, 2 - body)
+        :param update_free: not used, there is no index of free cells
+        :return: -
+        """
+        old_value = self._cells.pop((row, column), 0)
+        if value != 0:
+            self._cells[(row, column)] = value
+        if self._changed_cells is not None:
+            self._changed_cells.add((row, column))
+        if old_value == -1:
+            self._apple_cells.discard((row, column))
+        if value == -1:
+            self._apple_cells.add((row, column))
+
+    def get_symbol(self, row, column):
+        return SYMBOLS[self._cells.get((row, column), 0) + 1]
+
+    def count_free_steps(self, direction, steps):
+        """
+        Function to determine how many steps the snake can make in a straight line before something happens
+        (it meets an apple, an edge or its own body)
+        Instead of looking at every cell in front of the head, only the apples and the parts of the body are checked,
+        so it takes the same time for any number of steps
+        :param direction: a list with the coordinates which signal the direction in which the snake moves
+        :param steps: the maximum number of steps we look ahead
+        :return: the number of steps (at most 'steps') which don't need any check
+        """
+        x_axis = direction[0]
+        y_axis = direction[1]
+        head_x, head_y = self._snake[0]
+        steps = self.count_steps_to_edge(direction, steps)
+        length = len(self._snake)
+        for index, (row, column) in enumerate(self._snake):
+            distance = self.get_distance_ahead(head_x, head_y, x_axis, y_axis, row, column)
+            # The tail leaves one cell at every step, so the part 'index' is gone after length - index steps, and it
+            # only stops the snake if the head gets there sooner
+            if 0 < distance <= length - index:
+                steps = min(steps, distance - 1)
+        for row, column in self._apple_cells:
+            distance = self.get_distance_ahead(head_x, head_y, x_axis, y_axis, row, column)
+            if distance > 0:
+                steps = min(steps, distance - 1)
+        return steps
+
+    @staticmethod
+    def get_distance_ahead(head_x, head_y, x_axis, y_axis, row, column):
+        """
+        Function to get how many steps in a direction take the head to a cell
+        :return: the number of steps, or 0 if the cell isn't in front of the head
+        """
+        if x_axis == 0:
+            return (column - head_y) * y_axis if row == head_x and (column - head_y) * y_axis > 0 else 0
+        return (row - head_x) * x_axis if column == head_y and (row - head_x) * x_axis > 0 else 0
+
+    def make_free_steps(self, direction, steps):
+        """
+        Function used to move the snake a number of steps in which it doesn't meet anything (see 'count_free_steps'),
+        without any checks
+        There is no index of free cells to keep in order, so the cells the snake passes over without ending on them
+        are skipped: only min(steps, length of the snake) cells are freed and taken
+        :param direction: a list with the coordinates which signal the direction in which the snake moves
+        :param steps: the number of steps
+        :return: -
+        """
+        if steps == 0:
+            return
+        x_axis = direction[0]
+        y_axis = direction[1]
+        cells = self._cells
+        snake = self._snake
+        changed_cells = self._changed_cells
+        head_x, head_y = snake[0]
+        cells[(head_x, head_y)] = 2
+        if changed_cells is not None:
+            changed_cells.add((head_x, head_y))
+        moved = min(steps, len(snake))
+        for step in range(moved):
+            tail = snake.pop()
+            del cells[tail]
+            if changed_cells is not None:
+                changed_cells.add(tail)
+        # The body ends on the last 'moved' cells of the way
+        for step in range(steps - moved + 1, steps + 1):
+            cell = (head_x + step * x_axis, head_y + step * y_axis)
+            cells[cell] = 2
+            snake.appendleft(cell)
+            if changed_cells is not None:
+                changed_cells.add(cell)
+        cells[snake[0]] = 1
+
+    def place_new_apple(self):
+        """
+        Function used to set a new apple on a random cell which is empty and has no adjacent apples
+        :return: the coordinates of the new apple
+        """
+        columns = self._columns
+        size = self._rows * columns
+        for attempt in range(MAX_ATTEMPTS):
+            row, column = divmod(self._random.randrange(size), columns)
+            if self.can_hold_apple(row, column):
+                break
+            if self._stats is not None:
+                self._stats.count('apple_rejections')
+        else:
+            # The board is crowded, so we choose between the cells that are really free
+            free_cells = list(self.get_free_cells())
+            if not free_cells:
+                raise BoardFullError("There is no room left on the board for a new apple!")
+            row, column = divmod(free_cells[self._random.randrange(len(free_cells))], columns)
+        self.set_cell(row, column, -1)
+        return row, column
+
+    def __str__(self):
+        border = '+' + '---+' * self._columns
+        lines = [border]
+        for row in range(self._rows):
+            lines.append('| ' + ' | '.join([self.get_symbol(row, column) for column in range(self._columns)]) + ' |')
+            lines.append(border)
+        return '\n'.join(lines)
@@ -0,0 +1,76 @@
+import json
+
+
+'''
+The 'Stats' class collects the measurements of a game, when instrumentation is turned on:
+    - timings: for every name (a UI command like 'move' or 'render', or a phase of a move like 'bounds_check'), how many
+      times it was measured, the total time and the longest time (in seconds)
+    - counters: plain counts of events (e.g. 'apples_placed', or 'apple_rejections' on a SparseBoard)
+
+Nothing is measured unless a Stats object is given to the Board (with 'set_stats') and to the UI, and when none is
+given the game only pays for one 'is None' check per move or command.
+
+Example of the JSON written by 'dump':
+    {
+        "timings": {"move": {"count": 2, "total": 0.0003, "mean": 0.00015, "max": 0.0002}, ...},
+        "counters": {"apples_placed": 1}
+    }
+'''
+class Stats:
+    def __init__(self):
+        self._timings = {}  # name -> [count, total, max]
+        self._counters = {}
+
+    def add_time(self, name, seconds):
+        """
+        Function used to record one measurement
+        :param name: the name of what was measured
+        :param seconds: how long it took
+        :return: -
+        """
+        timing = self._timings.get(name)
+        if timing is None:
+            self._timings[name] = [1, seconds, seconds]
+        else:
+            timing[0] += 1
+            timing[1] += seconds
+            if seconds > timing[2]:
+                timing[2] = seconds
+
+    def count(self, name, amount=1):
+        self._counters[name] = self._counters.get(name, 0) + amount
+
+    def get_timing(self, name):
+        """
+        Function to get the measurements of a name
+        :param name: the name of what was measured
+        :return: a dictionary with the count, total, mean and max time (all 0 if it was never measured)
+        """
+        count, total, longest = self._timings.get(name, (0, 0.0, 0.0))
+        return {'count': count, 'total': total, 'mean': total / count if count else 0.0, 'max': longest}
+
+    def get_counter(self, name):
+        return self._counters.get(name, 0)
+
+    def to_dict(self):
+        return {
+            'timings': {name: self.get_timing(name) for name in sorted(self._timings)},
+            'counters': dict(sorted(self._counters.items())),
+        }
+
+    def dump(self, path):
+        """
+        Function used to write the stats to a JSON file
+        :param path: the path of the file
+        :return: -
+        """
+        with open(path, 'w') as stats_file:
+            json.dump(self.to_dict(), stats_file, indent=2)
+
+    def __str__(self):
+        lines = ['%-16s %8s %12s %12s' % ('name', 'count', 'mean (us)', 'max (us)')]
+        for name, timing in self.to_dict()['timings'].items():
+            lines.append('%-16s %8d %12.1f %12.1f' % (name, timing['count'], timing['mean'] * 1e6, timing['max'] * 1e6))
+        for name, value in self.to_dict()['counters'].items():
+            lines.append('%-16s %8d' % (name, value))
+        return '\n'.join(lines)
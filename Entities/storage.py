@@ -0,0 +1,123 @@
+import mmap
+import re
+import struct
+
+
+'''
+The saved game format keeps a board in a few bytes per apple and a few bits per body part:
+    header:  b'SNKS', version (1 byte), rows, columns (4 bytes each), direction (1 byte), apples on the board,
+             snake length, head row, head column (4 bytes each)
+    grid:    2 bits for every cell, in row-major order, 4 cells in a byte (the first cell in the lowest bits):
+             0 - empty (the snake's cells are empty here too), 1 - apple
+    snake:   2 bits for every body part after the head, packed the same way: the direction (0 - up, 1 - down,
+             2 - left, 3 - right) in which the next body part is found, going from the head to the tail
+
+Example - a 3 x 3 board with the snake going down from (0, 1) to (2, 1), and apples in (0, 0) and (2, 2):
+    grid:  00 00 00 01 | 00 00 00 00 | 00 00 00 01  ->  the cells 0 and 8 are apples
+    snake: 01 01  ->  'down', 'down'
+
+Loading memory-maps the file: the header and the snake are read directly, and the grid is searched (at the speed of
+the 're' module, which skips the zero bytes) only for its non-zero bytes, stopping when all the apples were found.
+So the file is never read into memory as a whole, and only the pages holding apples are decoded.
+'''
+MAGIC = b'SNKS'
+VERSION = 1
+HEADER = struct.Struct('<4sBIIBIIII')
+DIRECTIONS = [[-1, 0], [1, 0], [0, -1], [0, 1]]
+NON_ZERO_BYTE = re.compile(rb'[^\x00]')
+
+
+class SaveFileError(Exception):
+    def __init__(self, message=''):
+        self._message = message
+
+    def __str__(self):
+        return self._message
+
+
+def pack_codes(codes, count):
+    """
+    Function used to pack 2-bit codes, 4 in a byte
+    :param codes: the (position, code) pairs of the positions whose code isn't 0
+    :param count: the number of positions
+    :return: a bytearray with the packed codes
+    """
+    packed = bytearray((count + 3) // 4)
+    for position, code in codes:
+        packed[position >> 2] |= code << ((position & 3) * 2)
+    return packed
+
+
+def save_game(board, path):
+    """
+    Function used to save a board to a file
+    :param board: the Board
+    :param path: the path of the file
+    :return: -
+    """
+    rows, columns = board.get_dimensions()
+    snake = list(board.get_snake())
+    apples = board.get_apples()
+    grid = pack_codes(((row * columns + column, 1) for row, column in apples), rows * columns)
+    steps = []
+    for index in range(1, len(snake)):
+        step = [snake[index][0] - snake[index - 1][0], snake[index][1] - snake[index - 1][1]]
+        steps.append((index - 1, DIRECTIONS.index(step)))
+    head_x, head_y = snake[0]
+    with open(path, 'wb') as save_file:
+        save_file.write(HEADER.pack(MAGIC, VERSION, rows, columns, DIRECTIONS.index(board.get_direction()),
+                                    len(apples), len(snake), head_x, head_y))
+        save_file.write(grid)
+        save_file.write(pack_codes(steps, len(snake) - 1))
+
+
+def load_game(path):
+    """
+    Function used to read a saved board
+    :param path: the path of the file
+    :return: a dictionary with the rows, columns, direction, snake (from the head to the tail) and apples of the board
+    """
+    with open(path, 'rb') as save_file:
+        try:
+            data = mmap.mmap(save_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise SaveFileError("The saved game is empty!")
+    try:
+        if len(data) < HEADER.size:
+            raise SaveFileError("The saved game is too short!")
+        magic, version, rows, columns, direction, apple_count, length, head_x, head_y = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise SaveFileError("This is not a saved game!")
+        grid_start = HEADER.size
+        grid_end = grid_start + (rows * columns + 3) // 4
+        if len(data) < grid_end + (length + 2) // 4 or length < 1 or direction > 3:
+            raise SaveFileError("The saved game is damaged!")
+
+        # The snake is rebuilt from its head, following the direction codes
+        snake = [(head_x, head_y)]
+        for index in range(length - 1):
+            code = (data[grid_end + (index >> 2)] >> ((index & 3) * 2)) & 3
+            previous_x, previous_y = snake[-1]
+            snake.append((previous_x + DIRECTIONS[code][0], previous_y + DIRECTIONS[code][1]))
+
+        # Only the non-zero bytes of the grid hold apples
+        apples = []
+        for match in NON_ZERO_BYTE.finditer(data, grid_start, grid_end):
+            value = data[match.start()]
+            first_cell = (match.start() - grid_start) * 4
+            for shift in range(4):
+                if (value >> (shift * 2)) & 3 == 1:
+                    apples.append(divmod(first_cell + shift, columns))
+            if len(apples) >= apple_count:
+                break
+    finally:
+        data.close()
+
+    if len(apples) != apple_count:
+        raise SaveFileError("The saved game is damaged!")
+    for row, column in snake + apples:
+        if not (0 <= row < rows and 0 <= column < columns):
+            raise SaveFileError("The saved game is damaged!")
+    if len(set(snake + apples)) != len(snake) + len(apples):
+        raise SaveFileError("The saved game is damaged!")
+    return {'rows': rows, 'columns': columns, 'direction': DIRECTIONS[direction], 'snake': snake, 'apples': apples}
@@ -0,0 +1,292 @@
+import argparse
+import random
+import struct
+import sys
+import time
+import zlib
+from array import array
+from Entities.board import Board, BoardError
+from Service.service import Service, ServiceError
+
+
+'''
+The journal is an append-only binary file with everything needed to play a game again, exactly as it happened:
+the seed of the random number generator which places the apples, and every command given to the Service.
+
+File layout:
+    header:   b'SNKJ', version (1 byte), rows, columns, apples (4 bytes each), seed (8 bytes)
+    records:  a tag (1 byte) followed by a 4-byte signed number
+        b'M' steps          - 'move steps'
+        b'D' direction      - a change of direction (0 - up, 1 - down, 2 - left, 3 - right)
+        b'S' length         - a snapshot of the board, followed by 'length' bytes (see 'pack_snapshot')
+
+Every 'snapshot_interval' commands, the writer adds a snapshot of the board, taken after that many commands.
+To get to the state after any command, the replay loads the last snapshot before it and plays only the commands that
+follow (the first state of the game doesn't need a snapshot, since it comes from the seed).
+
+A snapshot is compressed with zlib and holds the direction, the snake, the apples, the state of the random number
+generator and the index of free cells (in its exact order), so the apples placed after it are the same as in the game.
+The index is as big as the board, so a snapshot only holds the positions of the index which changed since the
+snapshot before it (or since the start of the game), with their cells, and its new length: the replay builds the
+index of the start of the game from the seed, and brings it up to date with the snapshots, one after another.
+This way, taking a snapshot costs as much as the snake and the changes since the last one, and not the whole board.
+
+The records are gathered in a buffer, which is written to the file when it gets full (or on 'flush' and 'close'), so
+recording a command only adds a few bytes to the buffer.
+'''
+MAGIC = b'SNKJ'
+VERSION = 2
+HEADER = struct.Struct('<4sBIIIq')
+RECORD = struct.Struct('<ci')
+DIRECTION_NAMES = ['up', 'down', 'left', 'right']
+DIRECTIONS = [[-1, 0], [1, 0], [0, -1], [0, 1]]
+# The longest move which is recorded as it is; the snake can't go straight for longer than the board's side,
+# so a longer move ends the game exactly like this one does
+MAX_STEPS = 2 ** 31 - 1
+
+
+class JournalError(Exception):
+    def __init__(self, message=''):
+        self._message = message
+
+    def __str__(self):
+        return self._message
+
+
+def pack_snapshot(board, commands, changed_positions):
+    """
+    Function used to save the state of a board in a compact form
+    :param board: the Board
+    :param commands: the number of commands given before this state
+    :param changed_positions: the positions of the index of free cells which changed since the previous snapshot
+    :return: the bytes of the snapshot
+    """
+    rows, columns = board.get_dimensions()
+    snake = array('I', [row * columns + column for row, column in board.get_snake()])
+    apples = array('I', sorted(row * columns + column for row, column in board.get_apples()))
+    free_cells = board.get_free_cells()
+    # The positions past the end of the index were freed, and the new length is enough to drop them
+    positions = array('I', sorted(position for position in changed_positions if position < len(free_cells)))
+    cells = array('I', [free_cells[position] for position in positions])
+    version, internal_state, gauss_next = board.get_random().getstate()
+    rng_state = array('I', internal_state)
+    payload = b''.join([
+        struct.pack('<qBIIII', commands, DIRECTIONS.index(board.get_direction()), len(snake), len(apples),
+                    len(free_cells), len(positions)),
+        snake.tobytes(), apples.tobytes(), positions.tobytes(), cells.tobytes(),
+        struct.pack('<BI?d', version, len(rng_state), gauss_next is not None, gauss_next or 0.0),
+        rng_state.tobytes(),
+    ])
+    return zlib.compress(payload, 1)
+
+
+def unpack_snapshot(data, rows, columns, apples, free_cells, engine='list', build=True):
+    """
+    Function used to rebuild a board from a snapshot
+    :param data: the bytes of the snapshot
+    :param rows: the number of rows of the board
+    :param columns: the number of columns of the board
+    :param apples: the number of apples of the game
+    :param free_cells: the index of free cells at the previous snapshot (or at the start of the game), as an
+                       array('l'), which is brought up to this snapshot
+    :param engine: the engine of the new board
+    :param build: False to only bring 'free_cells' up to date, without building the board
+    :return: a tuple with the number of commands given before this state, and the Board (None if it isn't built)
+    """
+    payload = zlib.decompress(data)
+    commands, direction, snake_length, apple_count, free_count, change_count = struct.unpack_from('<qBIIII', payload)
+    offset = struct.calcsize('<qBIIII')
+    cells = []
+    for count in (snake_length, apple_count, change_count, change_count):
+        part = array('I')
+        part.frombytes(payload[offset:offset + 4 * count])
+        cells.append(part)
+        offset += 4 * count
+    snake, apple_cells, positions, changed_cells = cells
+    if free_count < len(free_cells):
+        del free_cells[free_count:]
+    else:
+        free_cells.extend(array('l', [0]) * (free_count - len(free_cells)))
+    for position, cell in zip(positions, changed_cells):
+        free_cells[position] = cell
+    if not build:
+        return commands, None
+    version, state_length, has_gauss, gauss_next = struct.unpack_from('<BI?d', payload, offset)
+    offset += struct.calcsize('<BI?d')
+    internal_state = array('I')
+    internal_state.frombytes(payload[offset:offset + 4 * state_length])
+    rng = random.Random()
+    rng.setstate((version, tuple(internal_state), gauss_next if has_gauss else None))
+    board = Board.from_state(rows, columns, apples, DIRECTIONS[direction],
+                             [divmod(cell, columns) for cell in snake],
+                             [divmod(cell, columns) for cell in apple_cells],
+                             free_cells, rng, engine)
+    return commands, board
+
+
+class JournalWriter:
+    def __init__(self, path, board, seed, snapshot_interval=None, buffer_size=1 << 16):
+        """
+        Creates the journal of a game which just started
+        :param path: the path of the journal file
+        :param board: the Board of the game, created with random.Random(seed)
+        :param seed: the seed of the game
+        :param snapshot_interval: the number of commands between two snapshots (by default, more for bigger boards,
+                                  so the replay has fewer snapshots to go through)
+        :param buffer_size: the size of the write buffer
+        """
+        rows, columns = board.get_dimensions()
+        self._board = board
+        self._commands = 0
+        self._snapshot_interval = snapshot_interval or max(1000, rows * columns // 64)
+        self._until_snapshot = self._snapshot_interval  # the number of commands left before the next snapshot
+        self._buffer_size = buffer_size
+        self._buffer = bytearray(HEADER.pack(MAGIC, VERSION, rows, columns, board.get_apple_count(), seed))
+        self._file = open(path, 'wb')
+        # The positions of the index of free cells which changed since the last snapshot
+        self._changed_positions = set()
+        board.watch_free_cells(self._changed_positions)
+
+    def record_move(self, steps):
+        self.record(b'M', max(-MAX_STEPS, min(steps, MAX_STEPS)))
+
+    def record_direction(self, direction_name):
+        self.record(b'D', DIRECTION_NAMES.index(direction_name))
+
+    def record(self, tag, value):
+        """
+        Function used to add a command to the journal (before it is carried out)
+        :param tag: the kind of the command
+        :param value: the number which goes with it
+        :return: -
+        """
+        if self._until_snapshot == 0:
+            # The board is still in the state after the previous command, which is what the snapshot needs
+            snapshot = pack_snapshot(self._board, self._commands, self._changed_positions)
+            self._changed_positions.clear()
+            self._buffer += RECORD.pack(b'S', len(snapshot))
+            self._buffer += snapshot
+            self._until_snapshot = self._snapshot_interval
+        self._until_snapshot -= 1
+        self._commands += 1
+        self._buffer += RECORD.pack(tag, value)
+        if len(self._buffer) >= self._buffer_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Function used to write the buffered records to the file
+        :return: -
+        """
+        self._file.write(self._buffer)
+        self._file.flush()
+        self._buffer.clear()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+            self._board.watch_free_cells(None)
+
+
+class JournalReader:
+    def __init__(self, path):
+        """
+        Opens a journal, finding where its snapshots are
+        :param path: the path of the journal file
+        """
+        with open(path, 'rb') as journal_file:
+            self._data = journal_file.read()
+        if len(self._data) < HEADER.size:
+            raise JournalError("The journal is too short!")
+        magic, version, self._rows, self._columns, self._apples, self._seed = HEADER.unpack_from(self._data)
+        if magic != MAGIC or version != VERSION:
+            raise JournalError("This is not a journal of the game!")
+        # The snapshots, as (number of commands before the snapshot, offset of the snapshot's record)
+        self._snapshots = []
+        self._commands = 0
+        offset = HEADER.size
+        data = self._data
+        unpack_record = RECORD.unpack_from
+        end = len(data) - RECORD.size
+        while offset <= end:
+            tag, value = unpack_record(data, offset)
+            if tag == b'S':
+                self._snapshots.append((self._commands, offset))
+                offset += RECORD.size + value
+            else:
+                self._commands += 1
+                offset += RECORD.size
+
+    def get_command_count(self):
+        return self._commands
+
+    def get_seed(self):
+        return self._seed
+
+    def replay(self, until=None, engine='list'):
+        """
+        Function used to get the state of the game after a number of commands
+        :param until: the number of commands (by default, all of them)
+        :param engine: the engine of the board
+        :return: the Board after 'until' commands (or after the command which ended the game, if that came first)
+        """
+        if until is None or until > self._commands:
+            until = self._commands
+        # We start from the last snapshot before 'until', or from the seed if there is none; the index of free cells
+        # is built from the seed, and every snapshot before that one brings it up to date
+        board = Board(self._rows, self._apples, engine, random.Random(self._seed), self._columns)
+        commands, offset = 0, HEADER.size
+        snapshots = [snapshot for snapshot in self._snapshots if snapshot[0] <= until]
+        if snapshots:
+            free_cells = array('l', board.get_free_cells())
+            for index, (snapshot_commands, snapshot_offset) in enumerate(snapshots):
+                length = RECORD.unpack_from(self._data, snapshot_offset)[1]
+                start = snapshot_offset + RECORD.size
+                commands, snapshot_board = unpack_snapshot(self._data[start:start + length], self._rows,
+                                                           self._columns, self._apples, free_cells, engine,
+                                                           index == len(snapshots) - 1)
+            board = snapshot_board
+            offset = start + length
+        service = Service(board)
+        data = self._data
+        unpack_record = RECORD.unpack_from
+        while commands < until:
+            tag, value = unpack_record(data, offset)
+            offset += RECORD.size
+            if tag == b'S':
+                offset += value
+                continue
+            commands += 1
+            try:
+                if tag == b'M':
+                    service.move_snake(value)
+                else:
+                    service.change_direction(DIRECTION_NAMES[value])
+            except ServiceError:
+                pass
+            except BoardError:
+                break
+        return board
+
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description='Replay the journal of a game')
+    parser.add_argument('path')
+    parser.add_argument('--until', type=int, help='the number of commands to replay (by default, all of them)')
+    parser.add_argument('--engine', default='list', choices=['list', 'numpy', 'auto'])
+    parser.add_argument('--show', action='store_true', help='print the board at the end')
+    options = parser.parse_args(arguments)
+    started = time.perf_counter()
+    reader = JournalReader(options.path)
+    board = reader.replay(options.until, options.engine)
+    elapsed = time.perf_counter() - started
+    if options.show:
+        print(board)
+    print('%d commands in the journal, seed %d' % (reader.get_command_count(), reader.get_seed()))
+    print('snake length %d, head at %s, replayed in %.3f s' % (board.long_snake(), board.get_snake_head(), elapsed))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
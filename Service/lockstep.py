@@ -0,0 +1,361 @@
+import random
+import numpy
+from Entities.board import Board, BoardFullError
+
+
+'''
+The lockstep games are many small games of snake played side by side, with one call which moves the snake of every
+game by one cell ('step'), e.g. for training movement strategies, where a Python 'Board.move' for every game and every
+step would take most of the time.
+
+All the games are kept in NumPy arrays, with one row (of rows * columns values) for every game:
+    - the matrix of the board, with the values of the Board (0 empty, -1 apple, 1 head, 2 body)
+    - for every cell, the number of apples next to it, and the index of free cells (the free cells in their order, and
+      the position of every cell in it), exactly like 'FreeCells'
+    - the snake, as a ring buffer of cells: the head is at 'heads[game]', the next parts follow it, and moving the
+      snake only writes the new head in front of it (over the old tail's place, when the snake doesn't grow)
+    - the random number generator of the game: the 624 numbers of a Mersenne Twister (the generator of
+      'random.Random'), with the position of the next one
+Every step is done for all the games at once, the games in which something else happens (the snake eats, or the game
+ends) being picked out with masks; the changes of the index of free cells are made in the same order as in a Board,
+and a new apple is drawn from the game's generator exactly like 'random.Random.randrange' draws it.
+
+This makes the games exactly the same as the scalar ones: the game with the seed s, given the same directions,
+plays like a Board(dimension, apples, 'list', random.Random(s)) moved through its Service (a direction turned by 180
+degrees is ignored). When a game ends, it starts again at once, with a new Board which goes on with the same
+generator, as in:
+    rng = random.Random(seed)
+    while True:
+        board = Board(dimension, apples, 'list', rng)
+        ... (play until the game ends)
+'get_board' builds the Board of a game in its current state, which goes on exactly like the lockstep game.
+
+The actions are the numbers of the directions (0 up, 1 down, 2 left, 3 right), or -1 to keep the direction.
+'''
+DIRECTIONS = [[-1, 0], [1, 0], [0, -1], [0, 1]]
+ROW_STEPS = numpy.array([-1, 1, 0, 0])
+COLUMN_STEPS = numpy.array([0, 0, -1, 1])
+OPPOSITE = numpy.array([1, 0, 3, 2])
+# The constants of the Mersenne Twister (MT19937), as used by 'random.Random'
+STATE_SIZE = 624
+SHIFT_SIZE = 397
+MATRIX_A = numpy.uint32(0x9908b0df)
+UPPER_MASK = numpy.uint32(0x80000000)
+LOWER_MASK = numpy.uint32(0x7fffffff)
+
+
+class LockstepGames:
+    def __init__(self, seeds, dimension, apples):
+        """
+        Creates the games, one for every seed
+        :param seeds: the seeds of the games' random number generators
+        :param dimension: the dimension of the boards
+        :param apples: the number of apples of every game
+        """
+        seeds = list(seeds)
+        self._count = count = len(seeds)
+        self._rows = self._columns = dimension
+        self._size = size = dimension * dimension
+        self._apples = apples
+        # Every game starts from the same board, before the apples are placed
+        board = Board.__new__(Board)
+        board.create_empty_board(dimension, dimension, apples, 'list', None)
+        board.set_snake()
+        self._start_free_cells = numpy.array(board.get_free_cells(), dtype=numpy.int32)
+        self._start_positions = numpy.full(size, -1, dtype=numpy.int32)
+        self._start_positions[self._start_free_cells] = numpy.arange(len(self._start_free_cells))
+        self._start_snake = numpy.array([row * dimension + column for row, column in board.get_snake()],
+                                        dtype=numpy.int32)
+        self._start_matrix = numpy.zeros(size, dtype=numpy.int8)
+        self._start_matrix[self._start_snake] = 2
+        self._start_matrix[self._start_snake[0]] = 1
+
+        # The rows of all the games, one after the other, so a cell of a game is 'bases[game] + cell'
+        self._bases = numpy.arange(count, dtype=numpy.int64) * size
+        self._matrix = numpy.zeros(count * size, dtype=numpy.int8)
+        self._blocked = numpy.zeros(count * size, dtype=numpy.int8)
+        self._free_cells = numpy.zeros(count * size, dtype=numpy.int32)
+        self._positions = numpy.zeros(count * size, dtype=numpy.int32)
+        self._free_counts = numpy.zeros(count, dtype=numpy.int64)
+        self._body = numpy.zeros(count * size, dtype=numpy.int32)
+        self._heads = numpy.zeros(count, dtype=numpy.int64)
+        self._lengths = numpy.zeros(count, dtype=numpy.int64)
+        self._directions = numpy.zeros(count, dtype=numpy.int64)
+        self._scores = numpy.zeros(count, dtype=numpy.int64)
+        self._final_lengths = numpy.zeros(count, dtype=numpy.int64)
+        self._episodes = numpy.zeros(count, dtype=numpy.int64)
+        self._states = numpy.zeros((count, STATE_SIZE), dtype=numpy.uint32)
+        self._state_positions = numpy.zeros(count, dtype=numpy.int64)
+        for game, seed in enumerate(seeds):
+            state = random.Random(seed).getstate()[1]
+            self._states[game] = state[:STATE_SIZE]
+            self._state_positions[game] = state[STATE_SIZE]
+        self.reset(numpy.arange(count))
+
+    def get_count(self):
+        return self._count
+
+    def get_dimensions(self):
+        return self._rows, self._columns
+
+    # The boards of all the games, as an array of (games, rows, columns) values (this array must not be changed)
+    def get_matrices(self):
+        return self._matrix.reshape(self._count, self._rows, self._columns)
+
+    def get_lengths(self):
+        return self._lengths
+
+    # The number of apples eaten in the current game of every row
+    def get_scores(self):
+        return self._scores
+
+    # The length of the snake at the end of the last finished game of every row (0 if none has finished yet)
+    def get_final_lengths(self):
+        return self._final_lengths
+
+    # The number of finished games of every row
+    def get_episodes(self):
+        return self._episodes
+
+    def reset(self, games):
+        """
+        Function used to start new games, placing their apples with their own random number generators
+        :param games: the numbers of the games (without repetitions)
+        :return: -
+        """
+        if len(games) == 0:
+            return
+        size = self._size
+        matrices = self._matrix.reshape(self._count, size)
+        matrices[games] = self._start_matrix
+        self._blocked.reshape(self._count, size)[games] = 0
+        self._free_cells.reshape(self._count, size)[games, :len(self._start_free_cells)] = self._start_free_cells
+        self._positions.reshape(self._count, size)[games] = self._start_positions
+        self._free_counts[games] = len(self._start_free_cells)
+        self._body.reshape(self._count, size)[games, :len(self._start_snake)] = self._start_snake
+        self._heads[games] = 0
+        self._lengths[games] = len(self._start_snake)
+        self._directions[games] = 0
+        self._scores[games] = 0
+        for apple in range(self._apples):
+            if self.place_apples(games).any():
+                raise BoardFullError("There is no room left on the board for a new apple!")
+
+    def step(self, actions):
+        """
+        Function used to move the snake of every game by one cell, starting a new game where the snake hit something
+        (or where there was no room left for a new apple)
+        :param actions: an array with the direction of every game (0 up, 1 down, 2 left, 3 right, -1 to keep it)
+        :return: two arrays of booleans: the games in which the snake ate an apple, and the games which ended
+        """
+        actions = numpy.asarray(actions)
+        bases = self._bases
+        matrix = self._matrix
+        columns = self._columns
+        size = self._size
+        # A direction turned by 180 degrees is ignored, like the Service does
+        directions = self._directions
+        turned = (actions >= 0) & (actions != OPPOSITE[directions])
+        directions = numpy.where(turned, actions, directions)
+        self._directions = directions
+        heads = self._body[bases + self._heads]
+        head_rows, head_columns = numpy.divmod(heads, columns)
+        new_rows = head_rows + ROW_STEPS[directions]
+        new_columns = head_columns + COLUMN_STEPS[directions]
+        inside = (new_rows >= 0) & (new_rows < self._rows) & (new_columns >= 0) & (new_columns < columns)
+        # Outside the board, we look at the head itself, which is neither empty nor an apple
+        new_heads = numpy.where(inside, new_rows * columns + new_columns, heads)
+        values = matrix[bases + new_heads]
+        moves = numpy.flatnonzero(values == 0)
+        eats = values == -1
+        eaters = numpy.flatnonzero(eats)
+        over = ~eats & (values != 0)
+
+        # The snakes which only move: the tail leaves its cell, and the head takes a new one
+        if len(moves):
+            move_bases = bases[moves]
+            move_heads = new_heads[moves]
+            tails = self._body[move_bases + (self._heads[moves] + self._lengths[moves] - 1) % size]
+            matrix[move_bases + heads[moves]] = 2
+            matrix[move_bases + tails] = 0
+            freed = self._blocked[move_bases + tails] == 0
+            self.add_free_cells(moves[freed], tails[freed])
+            matrix[move_bases + move_heads] = 1
+            self.discard_free_cells(moves, move_heads)
+            slots = (self._heads[moves] - 1) % size
+            self._heads[moves] = slots
+            self._body[move_bases + slots] = move_heads
+
+        # The snakes which eat: the apple's neighbours are released, the snake grows, and a new apple is placed
+        if len(eaters):
+            eater_bases = bases[eaters]
+            eater_heads = new_heads[eaters]
+            matrix[eater_bases + heads[eaters]] = 2
+            matrix[eater_bases + eater_heads] = 1
+            for neighbours, cells in self.neighbours(eaters, eater_heads):
+                places = bases[neighbours] + cells
+                self._blocked[places] -= 1
+                released = (self._blocked[places] == 0) & (matrix[places] == 0)
+                self.add_free_cells(neighbours[released], cells[released])
+            slots = (self._heads[eaters] - 1) % size
+            self._heads[eaters] = slots
+            self._body[eater_bases + slots] = eater_heads
+            self._lengths[eaters] += 1
+            self._scores[eaters] += 1
+            over[eaters[self.place_apples(eaters)]] = True
+
+        ended = numpy.flatnonzero(over)
+        if len(ended):
+            self._final_lengths[ended] = self._lengths[ended]
+            self._episodes[ended] += 1
+            self.reset(ended)
+        return eats, over
+
+    def neighbours(self, games, cells):
+        """
+        Function to get the neighbours of a cell in every game, in the order in which 'Board.set_cell' goes over them
+        (up, down, left, right)
+        :param games: the numbers of the games
+        :param cells: the cell of every game
+        :return: a list of four pairs (the games which have that neighbour, and the neighbour's cell)
+        """
+        rows, columns = numpy.divmod(cells, self._columns)
+        result = []
+        for inside, offset in ((rows > 0, -self._columns), (rows < self._rows - 1, self._columns),
+                               (columns > 0, -1), (columns < self._columns - 1, 1)):
+            result.append((games[inside], cells[inside] + offset))
+        return result
+
+    def add_free_cells(self, games, cells):
+        """
+        Function used to add a cell, which isn't in the index, at the end of the index of free cells of every game
+        :param games: the numbers of the games (without repetitions)
+        :param cells: the cell of every game
+        :return: -
+        """
+        if len(games) == 0:
+            return
+        bases = self._bases[games]
+        counts = self._free_counts[games]
+        self._free_cells[bases + counts] = cells
+        self._positions[bases + cells] = counts
+        self._free_counts[games] = counts + 1
+
+    def discard_free_cells(self, games, cells):
+        """
+        Function used to remove a cell from the index of free cells of every game (if it is there), moving the last
+        free cell in its place
+        :param games: the numbers of the games (without repetitions)
+        :param cells: the cell of every game
+        :return: -
+        """
+        places = self._bases[games] + cells
+        positions = self._positions[places]
+        found = positions >= 0
+        if not found.all():
+            games = games[found]
+            places = places[found]
+            positions = positions[found]
+        if len(games) == 0:
+            return
+        bases = self._bases[games]
+        last_positions = self._free_counts[games] - 1
+        last_cells = self._free_cells[bases + last_positions]
+        self._free_cells[bases + positions] = last_cells
+        self._positions[bases + last_cells] = positions
+        self._positions[places] = -1
+        self._free_counts[games] = last_positions
+
+    def place_apples(self, games):
+        """
+        Function used to place a new apple in every game, on a random cell of its index of free cells
+        :param games: the numbers of the games (without repetitions)
+        :return: an array of booleans, True for the games in which there was no room for the apple
+        """
+        full = self._free_counts[games] == 0
+        if full.any():
+            games = games[~full]
+        if len(games) == 0:
+            return full
+        bases = self._bases[games]
+        cells = self._free_cells[bases + self.random_below(games, self._free_counts[games])]
+        self._matrix[bases + cells] = -1
+        for neighbours, neighbour_cells in self.neighbours(games, cells):
+            self._blocked[self._bases[neighbours] + neighbour_cells] += 1
+            self.discard_free_cells(neighbours, neighbour_cells)
+        self.discard_free_cells(games, cells)
+        return full
+
+    def random_below(self, games, limits):
+        """
+        Function to draw a random number below a limit in every game, like 'random.Random.randrange(limit)': a number
+        of as many bits as the limit has, drawn again until it is below the limit
+        :param games: the numbers of the games (without repetitions)
+        :param limits: the limit of every game (at least 1)
+        :return: an array with the numbers
+        """
+        shifts = (32 - numpy.frexp(limits.astype(numpy.float64))[1]).astype(numpy.uint32)
+        result = numpy.zeros(len(games), dtype=numpy.int64)
+        pending = numpy.arange(len(games))
+        while len(pending):
+            numbers = self.next_random(games[pending]) >> shifts[pending]
+            accepted = numbers < limits[pending]
+            result[pending[accepted]] = numbers[accepted]
+            pending = pending[~accepted]
+        return result
+
+    def next_random(self, games):
+        """
+        Function to draw the next 32-bit number of the random number generator of every game
+        :param games: the numbers of the games (without repetitions)
+        :return: an array of uint32 numbers
+        """
+        positions = self._state_positions[games]
+        spent = positions >= STATE_SIZE
+        if spent.any():
+            self.twist(games[spent])
+            positions[spent] = 0
+        numbers = self._states[games, positions]
+        self._state_positions[games] = positions + 1
+        numbers ^= numbers >> 11
+        numbers ^= (numbers << 7) & numpy.uint32(0x9d2c5680)
+        numbers ^= (numbers << 15) & numpy.uint32(0xefc60000)
+        numbers ^= numbers >> 18
+        return numbers
+
+    def twist(self, games):
+        """
+        Function used to compute the next 624 numbers of the random number generator of every game
+        Every number needs the one SHIFT_SIZE places after it, which is already a new one for the last part of the
+        state, so the numbers are computed in blocks in which they only need numbers computed before the block
+        :param games: the numbers of the games
+        :return: -
+        """
+        state = self._states[games]
+        for start, stop in ((0, STATE_SIZE - SHIFT_SIZE), (STATE_SIZE - SHIFT_SIZE, 2 * (STATE_SIZE - SHIFT_SIZE)),
+                            (2 * (STATE_SIZE - SHIFT_SIZE), STATE_SIZE - 1), (STATE_SIZE - 1, STATE_SIZE)):
+            indices = numpy.arange(start, stop)
+            numbers = (state[:, indices] & UPPER_MASK) | (state[:, (indices + 1) % STATE_SIZE] & LOWER_MASK)
+            state[:, indices] = state[:, (indices + SHIFT_SIZE) % STATE_SIZE] ^ (numbers >> 1) ^ \
+                ((numbers & 1) * MATRIX_A)
+        self._states[games] = state
+
+    def get_board(self, game):
+        """
+        Function to build the Board of a game in its current state, with its index of free cells and its random
+        number generator, so it goes on exactly like the lockstep game
+        :param game: the number of the game
+        :return: the Board
+        """
+        base = int(self._bases[game])
+        size = self._size
+        rng = random.Random()
+        rng.setstate((3, tuple(self._states[game].tolist()) + (int(self._state_positions[game]),), None))
+        head = int(self._heads[game])
+        snake = [divmod(int(self._body[base + (head + part) % size]), self._columns)
+                 for part in range(int(self._lengths[game]))]
+        apples = [divmod(int(cell), self._columns)
+                  for cell in numpy.flatnonzero(self._matrix[base:base + size] == -1)]
+        free_cells = self._free_cells[base:base + int(self._free_counts[game])].tolist()
+        return Board.from_state(self._rows, self._columns, self._apples, DIRECTIONS[self._directions[game]], snake,
+                                apples, free_cells, rng)
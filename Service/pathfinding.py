@@ -0,0 +1,353 @@
+import heapq
+from array import array
+from collections import deque
+
+
+'''
+The autopilot steers the snake towards the nearest apple, using a distance field: for every cell of the board, the
+length of the shortest path from it to an apple, going around the snake's body (INFINITY if there is none).
+
+Building the field takes a breadth-first search over the whole board, so it is built only once, and then kept up to
+date with the changes of the board since the last step (found from the two ends of the snake and from the apples):
+    - a cell which became free (the tail moved) or an apple which was placed can only bring the distances down, so
+      they spread from that cell, as far as they get shorter ('lower_cells')
+    - a cell which became blocked (the head moved) or an apple which was eaten can only make the distances longer,
+      and only for the cells whose shortest path went through it; these cells are found first (a cell keeps its
+      distance if a neighbour still has a distance one shorter), and then only they are computed again, starting
+      from the cells around them ('raise_cells')
+In a usual step, both changes only touch the cells near the snake's ends, which is far less than the whole board.
+
+Before taking the way towards the apple, the autopilot checks that the snake won't be trapped there: a flood fill
+from the new head which counts the steps to every cell, so the cells of the body become free as the tail leaves
+them; it stops as soon as it reaches one of them (from there, the snake can follow its tail) or has found room for
+ROOM_FACTOR times the snake, so it costs about the length of the snake. When no apple can be reached safely, the
+snake follows its own tail, which keeps it alive until the way to an apple opens again. When no move at all is safe,
+the snake takes the one with the most room around it ('count_room').
+'''
+INFINITY = 2 ** 31 - 1
+# The room which is enough for the snake, in lengths of the snake, when the flood fill doesn't reach the tail
+ROOM_FACTOR = 4
+DIRECTIONS = {'up': (-1, 0), 'down': (1, 0), 'left': (0, -1), 'right': (0, 1)}
+
+
+class Pathfinder:
+    def __init__(self, board):
+        self._board = board
+        self._rows, self._columns = board.get_dimensions()
+        size = self._rows * self._columns
+        self._distances = array('l', [INFINITY]) * size
+        self._blocked = bytearray(size)     # 1 for the cells of the snake
+        self._sources = bytearray(size)     # 1 for the cells of the apples
+        self._snake = deque()               # the cells of the snake, as the field knows it (head first)
+        self._apples = set()
+        self._updated_cells = 0             # how many cells the updates of the field have touched
+        self._stale = False                 # True when the board changed in a way the update can't follow
+        self.rebuild()
+
+    def get_distance(self, row, column):
+        return self._distances[row * self._columns + column]
+
+    def get_updated_cells(self):
+        return self._updated_cells
+
+    # This function is used when the snake moved without the autopilot, so the next update builds the whole field again
+    def invalidate(self):
+        self._stale = True
+
+    def neighbours(self, cell):
+        """
+        Function to get the cells next to a cell (up, down, left and right, within the board)
+        :param cell: the number of the cell (row * columns + column)
+        :return: a list with the numbers of the neighbouring cells
+        """
+        columns = self._columns
+        row, column = divmod(cell, columns)
+        result = []
+        if row > 0:
+            result.append(cell - columns)
+        if row < self._rows - 1:
+            result.append(cell + columns)
+        if column > 0:
+            result.append(cell - 1)
+        if column < columns - 1:
+            result.append(cell + 1)
+        return result
+
+    def rebuild(self):
+        """
+        Function used to build the whole distance field from the current board, with a breadth-first search
+        :return: -
+        """
+        columns = self._columns
+        size = self._rows * columns
+        self._blocked = bytearray(size)
+        self._sources = bytearray(size)
+        self._snake = deque(row * columns + column for row, column in self._board.get_snake())
+        self._apples = set(self._board.get_apples())
+        for cell in self._snake:
+            self._blocked[cell] = 1
+        distances = array('l', [INFINITY]) * size
+        queue = deque()
+        for row, column in self._apples:
+            cell = row * columns + column
+            self._sources[cell] = 1
+            distances[cell] = 0
+            queue.append(cell)
+        blocked = self._blocked
+        while queue:
+            cell = queue.popleft()
+            distance = distances[cell] + 1
+            for neighbour in self.neighbours(cell):
+                if distances[neighbour] > distance and not blocked[neighbour]:
+                    distances[neighbour] = distance
+                    queue.append(neighbour)
+        self._distances = distances
+        self._updated_cells += size
+        self._stale = False
+
+    def lower_cells(self, cells):
+        """
+        Function used to update the field after some cells became free or became apples
+        :param cells: the numbers of the cells
+        :return: -
+        """
+        distances = self._distances
+        blocked = self._blocked
+        heap = []
+        for cell in cells:
+            if blocked[cell]:
+                continue
+            if self._sources[cell]:
+                distance = 0
+            else:
+                distance = min([distances[neighbour] for neighbour in self.neighbours(cell)
+                                if not blocked[neighbour]] + [INFINITY - 1]) + 1
+            if distance < distances[cell]:
+                distances[cell] = distance
+                heapq.heappush(heap, (distance, cell))
+        updated = 0
+        while heap:
+            distance, cell = heapq.heappop(heap)
+            if distance > distances[cell]:
+                continue
+            updated += 1
+            for neighbour in self.neighbours(cell):
+                if distances[neighbour] > distance + 1 and not blocked[neighbour]:
+                    distances[neighbour] = distance + 1
+                    heapq.heappush(heap, (distance + 1, neighbour))
+        self._updated_cells += updated
+
+    def raise_cells(self, cells):
+        """
+        Function used to update the field after some cells became blocked or stopped being apples
+        :param cells: the numbers of the cells
+        :return: -
+        """
+        distances = self._distances
+        blocked = self._blocked
+        sources = self._sources
+        # First, we find the cells which lost their shortest path: a cell keeps its distance if one of its free
+        # neighbours, which didn't lose its own, is one step closer to an apple
+        invalid = set()
+        queue = deque(cells)
+        while queue:
+            cell = queue.popleft()
+            distance = distances[cell]
+            if cell in invalid or sources[cell] or distance == INFINITY:
+                continue
+            if not blocked[cell]:
+                supported = False
+                for neighbour in self.neighbours(cell):
+                    if distances[neighbour] == distance - 1 and not blocked[neighbour] and neighbour not in invalid:
+                        supported = True
+                        break
+                if supported:
+                    continue
+            invalid.add(cell)
+            for neighbour in self.neighbours(cell):
+                if distances[neighbour] == distance + 1:
+                    queue.append(neighbour)
+        # Then, only these cells get their distance again, starting from the neighbours which kept theirs
+        for cell in invalid:
+            distances[cell] = INFINITY
+        heap = []
+        for cell in invalid:
+            if blocked[cell]:
+                continue
+            distance = min([distances[neighbour] for neighbour in self.neighbours(cell)
+                            if not blocked[neighbour]] + [INFINITY - 1]) + 1
+            if distance < INFINITY:
+                distances[cell] = distance
+                heap.append((distance, cell))
+        heapq.heapify(heap)
+        while heap:
+            distance, cell = heapq.heappop(heap)
+            if distance > distances[cell]:
+                continue
+            for neighbour in self.neighbours(cell):
+                if neighbour in invalid and distances[neighbour] > distance + 1 and not blocked[neighbour]:
+                    distances[neighbour] = distance + 1
+                    heapq.heappush(heap, (distance + 1, neighbour))
+        self._updated_cells += len(invalid)
+
+    def update(self):
+        """
+        Function used to bring the field up to date with the board
+        The snake is compared from its ends: the cells in front of the old head are new, and the old snake loses as
+        many cells from its tail as needed to get the new length. The apples are compared when their number or the
+        snake's length changed (an apple is only eaten or placed then); anything else needs 'rebuild'.
+        After moves made without the autopilot (see 'invalidate'), the head may come back where it was, so the ends
+        of the snake don't show the change, and the field is built again.
+        :return: -
+        """
+        if self._stale:
+            self.rebuild()
+            return
+        columns = self._columns
+        snake = self._board.get_snake()
+        old_snake = self._snake
+        old_length = len(old_snake)
+        head_x, head_y = snake[0]
+        new_cells = []
+        if head_x * columns + head_y != old_snake[0] or len(snake) != old_length:
+            for row, column in snake:
+                cell = row * columns + column
+                if cell == old_snake[0]:
+                    break
+                new_cells.append(cell)
+            else:
+                self.rebuild()
+                return
+        freed_cells = [old_snake.pop() for _ in range(old_length + len(new_cells) - len(snake))]
+        for cell in reversed(new_cells):
+            old_snake.appendleft(cell)
+            self._blocked[cell] = 1
+        # We check the snake after its head and at its tail, and build the field again if the diff missed a change
+        second_x, second_y = snake[1] if len(snake) > 1 else snake[0]
+        tail_x, tail_y = snake[-1]
+        if len(old_snake) != len(snake) or old_snake[1 if len(snake) > 1 else 0] != second_x * columns + second_y or \
+                old_snake[-1] != tail_x * columns + tail_y:
+            self.rebuild()
+            return
+
+        eaten = []
+        placed = []
+        apples = self._board.get_apples()
+        if len(apples) != len(self._apples) or len(snake) != old_length:
+            for row, column in self._apples - apples:
+                eaten.append(row * columns + column)
+                self._sources[row * columns + column] = 0
+            for row, column in apples - self._apples:
+                placed.append(row * columns + column)
+            self._apples = set(apples)
+        # The field gets longer distances first, while the freed cells are still blocked, and then shorter ones
+        self.raise_cells(new_cells + eaten)
+        # (in a long move, the head may come back to a cell which the tail left, so that cell stays blocked)
+        still_blocked = set(new_cells)
+        freed_cells = [cell for cell in freed_cells if cell not in still_blocked]
+        for cell in freed_cells:
+            self._blocked[cell] = 0
+        for cell in placed:
+            self._sources[cell] = 1
+        self.lower_cells(freed_cells + placed)
+
+    def has_room(self, start, eats):
+        """
+        Function to check if the snake won't be trapped after its head moves to a cell
+        The flood fill counts the steps to every cell, so a cell of the body can be walked on once the tail has left it,
+        and it stops as soon as it reaches such a cell (the snake can then follow its tail) or finds room for
+        ROOM_FACTOR times the snake
+        :param start: the cell of the new head
+        :param eats: True if the head eats an apple there (so the tail stays where it is)
+        :return: True if the snake has room to go on, False otherwise
+        """
+        blocked = self._blocked
+        snake = self._snake
+        length = len(snake) + eats
+        # The head can only go where the tail was on the step after the tail left it, so the i-th cell of the body
+        # (from the head, before the move) can be walked on after length - i steps
+        leaves = {cell: length - index for index, cell in enumerate(snake)}
+        seen = {start}
+        queue = deque([(start, 0)])
+        while queue:
+            cell, steps = queue.popleft()
+            for neighbour in self.neighbours(cell):
+                if neighbour in seen:
+                    continue
+                if blocked[neighbour]:
+                    if leaves.get(neighbour, INFINITY) <= steps + 1:
+                        return True
+                    continue
+                seen.add(neighbour)
+                if len(seen) >= ROOM_FACTOR * length:
+                    return True
+                queue.append((neighbour, steps + 1))
+        return False
+
+    def count_room(self, start):
+        """
+        Function to count the free cells the snake can reach after its head moves to a cell
+        :param start: the cell of the new head
+        :return: the number of cells
+        """
+        blocked = self._blocked
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            for neighbour in self.neighbours(cell):
+                if neighbour not in seen and not blocked[neighbour]:
+                    seen.add(neighbour)
+                    queue.append(neighbour)
+        return len(seen) - 1
+
+    def next_direction(self):
+        """
+        Function to choose the direction of the snake's next step
+        :return: the name of the direction ('up', 'down', 'left' or 'right')
+        """
+        self.update()
+        board = self._board
+        columns = self._columns
+        snake = self._snake
+        head = snake[0]
+        head_x, head_y = divmod(head, columns)
+        tail_x, tail_y = divmod(snake[-1], columns)
+        current = tuple(board.get_direction())
+        candidates = []
+        for name, (x_axis, y_axis) in DIRECTIONS.items():
+            row, column = head_x + x_axis, head_y + y_axis
+            if not (0 <= row < self._rows and 0 <= column < columns):
+                continue
+            cell = row * columns + column
+            if self._blocked[cell] or (x_axis, y_axis) == (-current[0], -current[1]):
+                continue
+            # The apples first (the closest one, going straight if it's a tie), then the cells close to the tail
+            candidates.append((self._distances[cell], abs(row - tail_x) + abs(column - tail_y),
+                               (x_axis, y_axis) != current, name, cell))
+        candidates.sort()
+        length = len(snake)
+        areas = []
+        for distance, _, _, name, cell in candidates:
+            eats = self._sources[cell] == 1
+            # After the move, the head is in 'cell', and the tail leaves its cell (unless an apple is eaten)
+            self._blocked[cell] = 1
+            if not eats:
+                self._blocked[snake[-1]] = 0
+            safe = self.has_room(cell, eats)
+            if not safe:
+                areas.append((self.count_room(cell), name))
+            self._blocked[cell] = 0
+            self._blocked[snake[-1]] = 1
+            if safe:
+                return name
+        if areas:
+            # No move is safe, so the snake goes where it has the most room, which keeps it alive the longest
+            # (the first of the moves with the same room, so the order of the candidates breaks the ties)
+            most_room = max(area for area, name in areas)
+            for area, name in areas:
+                if area == most_room:
+                    return name
+        for name, axes in DIRECTIONS.items():
+            if list(axes) == board.get_direction():
+                return name
@@ -1,3 +1,5 @@
+from Service.pathfinding import Pathfinder
+
 
 # Basic error class for the service-related errors
 class ServiceError(Exception):
@@ -14,8 +16,10 @@ class ServiceError(Exception):
         then we call the corresponding functions from the Board, which is initialised in __init__
 '''
 class Service:
-    def __init__(self, board):
+    def __init__(self, board, journal=None):
         self._board = board
+        self._journal = journal  # if a JournalWriter is given, every command is recorded in it
+        self._pathfinder = None  # created by the first 'auto_move', then kept up to date with the board
 
     # Getting the current direction in which the snake is heading
     def get_direction(self):
@@ -27,13 +31,41 @@ class Service:
         The snake can move more than one cell, hence the 'steps' variable
         :param steps: The number of cells the snake moves over
         :return: -
-        In case there are more steps, the snake repeatedly moves over one cell (we use a loop here)
+        The snake moves in a straight line, so the Board only checks the steps in which it meets an apple,
+        an edge or its own body, and the rest of the steps are made all at once
+        '''
+        if self._pathfinder is not None:
+            # The autopilot can't follow moves it didn't make, so its field is built again before its next step
+            self._pathfinder.invalidate()
+        self.step_snake(steps)
+
+    def step_snake(self, steps):
+        '''
+        Function used to move the snake (see 'move_snake'), without telling the autopilot about it
+        :param steps: The number of cells the snake moves over
+        :return: -
         '''
+        if self._journal is not None:
+            self._journal.record_move(steps)
         direction = self.get_direction() # We get the direction it's moving
-        # Perform the move action a 'steps' number of times
-        for each_step in range(steps):
-            snake_x, snake_y = self._board.get_snake_head() # Because we actually only move the head, we need its coordinates first
-            self._board.move(snake_x, snake_y, direction)
+        self._board.move_straight(direction, steps)
+
+    def auto_move(self, steps):
+        """
+        Function used to let the autopilot steer the snake towards the apples (see 'Pathfinder')
+        :param steps: The number of cells the snake moves over
+        :return: -
+        Every step is an ordinary change of direction followed by a move of one cell, so it is recorded in the journal
+        like any other command
+        The autopilot keeps a distance for every cell of the board, so it isn't available on a sparse board
+        """
+        if self._pathfinder is None:
+            if self._board.is_sparse():
+                raise ServiceError("The autopilot needs the whole board, it can't steer on a sparse board!")
+            self._pathfinder = Pathfinder(self._board)
+        for step in range(steps):
+            self.change_direction(self._pathfinder.next_direction())
+            self.step_snake(1)
 
     def change_direction(self, direction_name):
         """
@@ -53,6 +85,8 @@ class Service:
             new_direction = [0, 1]
         else:
             raise ServiceError("Direction non existent!")
+        if self._journal is not None:
+            self._journal.record_direction(direction_name)
 
         # As the snake can't change its direction by 180 degrees (i.e. up->down or vice versa, left->right or vice versa),
         # we check if the direction change is a valid change, raising an error in the case it is not.
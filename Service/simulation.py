@@ -0,0 +1,112 @@
+import os
+import random
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from Entities.board import Board, BoardError, BoardFullError
+from Service.service import Service, ServiceError
+
+
+# The outcome of a single game:
+#   - seed: the seed of the game's random number generator (the same seed always gives the same game)
+#   - score: the number of apples the snake ate
+#   - length: the final length of the snake
+#   - steps: the number of cells the snake moved over
+#   - cause: why the game ended - 'edge', 'body' (the snake hit itself), 'full' (no room left for an apple)
+#            or 'limit' (the snake was still alive when the step limit was reached)
+GameResult = namedtuple('GameResult', ['seed', 'score', 'length', 'steps', 'cause'])
+
+
+'''
+The simulation runs whole games without any user and without drawing the board, so movement strategies can be
+compared over thousands of games.
+
+A strategy is a function which receives the Board (and a random number generator of its own, see below) before
+every step and returns the command for that step:
+    - 'up', 'down', 'left' or 'right' to turn the snake (an invalid turn, by 180 degrees, is ignored)
+    - None (or '') to keep the current direction
+After every command, the snake moves one cell, through the Service, exactly like in the game.
+The strategy must be a module-level function, so it can be sent to the worker processes.
+
+Every game gets its own random.Random(seed) for placing the apples, and the strategy gets another generator seeded
+from the same seed (random.Random('strategy <seed>')), which it must use for all its random choices. So running the
+same seeds again (with any number of workers) gives exactly the same results, even for a random strategy.
+'''
+def run_game(strategy, seed, dimension, apple_count, step_limit, engine='list'):
+    """
+    Function used to play a single game with the given strategy
+    :param strategy: function receiving the Board and a random.Random, and returning a command
+    :param seed: the seed of the game (of the apples, and of the strategy's generator)
+    :param dimension: the dimension of the board
+    :param apple_count: the number of apples on the board
+    :param step_limit: the maximum number of steps the snake makes
+    :param engine: the engine of the board (see 'create_engine')
+    :return: the GameResult of the game
+    """
+    board = Board(dimension, apple_count, engine, random.Random(seed))
+    strategy_random = random.Random('strategy %d' % seed)
+    service = Service(board)
+    initial_length = board.long_snake()
+    steps = 0
+    cause = 'limit'
+    while steps < step_limit:
+        command = strategy(board, strategy_random)
+        if command:
+            try:
+                service.change_direction(command)
+            except ServiceError:
+                pass
+        try:
+            service.move_snake(1)
+        except BoardFullError:
+            # The snake ate the apple before finding out there is no room for a new one
+            steps += 1
+            cause = 'full'
+            break
+        except BoardError:
+            cause = collision_cause(board)
+            break
+        steps += 1
+    length = board.long_snake()
+    return GameResult(seed, length - initial_length, length, steps, cause)
+
+
+def collision_cause(board):
+    """
+    Function to determine what the snake hit, when it couldn't make its last step
+    :param board: the Board of the game
+    :return: 'edge' if the snake would have left the board, 'body' if it hit itself
+    """
+    head_x, head_y = board.get_snake_head()
+    direction = board.get_direction()
+    rows, columns = board.get_dimensions()
+    next_x = head_x + direction[0]
+    next_y = head_y + direction[1]
+    if 0 <= next_x < rows and 0 <= next_y < columns:
+        return 'body'
+    return 'edge'
+
+
+def run_games(strategy, seeds, dimension, apple_count, step_limit, engine='list', workers=None):
+    """
+    Function used to play many games, spread across a pool of processes
+    :param strategy: function receiving the Board and a random.Random, and returning a command (it must be a
+                     module-level function)
+    :param seeds: the seeds of the games (one game is played for every seed)
+    :param dimension: the dimension of the boards
+    :param apple_count: the number of apples on the boards
+    :param step_limit: the maximum number of steps in a game
+    :param engine: the engine of the boards (see 'create_engine')
+    :param workers: the number of processes (by default, one for every core); with 1, the games run in this process
+    :return: a list with the GameResult of every game, in the order of the seeds
+    """
+    seeds = list(seeds)
+    play = partial(run_game, strategy, dimension=dimension, apple_count=apple_count, step_limit=step_limit,
+                   engine=engine)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [play(seed) for seed in seeds]
+    # The games are sent to the workers in chunks, so the processes don't wait for each other after every game
+    chunk_size = max(1, len(seeds) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(play, seeds, chunksize=chunk_size))
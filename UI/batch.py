@@ -0,0 +1,148 @@
+import sys
+from time import perf_counter
+from Entities.board import BoardError
+from Service.service import ServiceError
+
+
+'''
+The batch mode runs a whole script of commands (from a file, or piped to the program) without drawing the board
+before every command, and prints a single summary at the end: the board, the score and how the game ended.
+The commands are the same as in the game ('move [n]', 'auto [n]', 'up', 'down', 'left', 'right', 'exit').
+
+Consecutive 'move' commands are merged into one, since the snake goes the same way for all of them: 'move 3', 'move',
+'move 2' is a single 'move 6', which the Board makes in one go (see 'Board.move_straight').
+With 'render_every' set to k, the board is also drawn after every k commands (the merged moves are made before that),
+and the renderer is only imported then, so a script which doesn't draw the board doesn't load it.
+
+Example of the summary:
+    +---+---+---+
+    ...
+    status: game over (line 6): Snake game ended! It hit an edge or itself
+    score: 2 (snake length 5)
+    commands: 6, moves: 4 (made as 2)
+    errors: 1 - You can't change the direction by 180! (1)
+    time: 0.002 s
+'''
+class BatchRunner:
+    def __init__(self, board, service, render_every=None, output=sys.stdout, show_board=True):
+        """
+        Creates the runner of a script of commands
+        :param board: the Board
+        :param service: the Service of the board
+        :param render_every: draw the board after every 'render_every' commands (None to draw it only at the end)
+        :param output: the stream on which the board and the summary are written
+        :param show_board: False to leave the board out of the summary (e.g. when it is too big to be printed)
+        """
+        self._board = board
+        self._service = service
+        self._render_every = render_every
+        self._output = output
+        self._show_board = show_board
+        self._renderer = None
+        self._initial_length = board.long_snake()
+        self._commands = 0
+        self._moves = 0
+        self._merged_moves = 0
+        self._pending_steps = 0     # the steps of the 'move' commands which weren't made yet
+        self._line = 0  # the line of the command being run (for merged moves, the line of the last one)
+        self._move_line = 0
+        self._errors = {}   # message -> how many times it was given
+        self._status = 'alive'
+
+    def error(self, message):
+        self._errors[message] = self._errors.get(message, 0) + 1
+
+    def flush_moves(self):
+        """
+        Function used to make the steps of the merged 'move' commands
+        :return: -
+        """
+        if self._pending_steps > 0:
+            steps = self._pending_steps
+            self._pending_steps = 0
+            self._merged_moves += 1
+            self._line = self._move_line
+            self._service.move_snake(steps)
+
+    def execute(self, command_word, command_parameter):
+        """
+        Function used to run a command (the 'move' commands are only gathered, see 'flush_moves')
+        :param command_word: the first word of the command
+        :param command_parameter: the rest of the command
+        :return: False if the command ends the game, True otherwise
+        """
+        if command_word in ('move', 'auto'):
+            try:
+                steps = 1 if command_parameter == '' else int(command_parameter)
+            except ValueError as ve:
+                self.error(str(ve))
+                return True
+            if command_word == 'move':
+                self._moves += 1
+                self._pending_steps += max(steps, 0)
+                self._move_line = self._line
+            else:
+                self.flush_moves()
+                try:
+                    self._service.auto_move(steps)
+                except ServiceError as se:
+                    self.error(str(se))
+        elif command_word in ('up', 'down', 'left', 'right'):
+            self.flush_moves()
+            try:
+                self._service.change_direction(command_word)
+            except ServiceError as se:
+                self.error(str(se))
+        elif command_word == 'exit':
+            self._status = 'exited'
+            return False
+        else:
+            self.error('bad command')
+        return True
+
+    def run(self, stream):
+        """
+        Function used to run all the commands of a script, and to write the summary
+        :param stream: the stream from which the commands are read, one on every line
+        :return: the status of the game ('alive', 'exited' or 'game over ...')
+        """
+        started = perf_counter()
+        line_number = 0
+        try:
+            for line in stream:
+                line_number += 1
+                self._line = line_number
+                parts = line.split(None, 1)
+                if not parts:
+                    continue
+                self._commands += 1
+                if not self.execute(parts[0].lower(), parts[1].strip().lower() if len(parts) > 1 else ''):
+                    break
+                if self._render_every and self._commands % self._render_every == 0:
+                    self.flush_moves()
+                    self.render()
+            self.flush_moves()
+        except BoardError as be:
+            self._status = 'game over (line %d): %s' % (self._line, be)
+        self.write_summary(perf_counter() - started)
+        return self._status
+
+    def render(self):
+        if self._renderer is None:
+            from UI.renderer import PlainRenderer
+            self._renderer = PlainRenderer(self._board, self._output)
+        self._renderer.render()
+
+    def write_summary(self, elapsed):
+        length = self._board.long_snake()
+        lines = [str(self._board)] if self._show_board else []
+        lines += [
+            'status: ' + self._status,
+            'score: %d (snake length %d)' % (length - self._initial_length, length),
+            'commands: %d, moves: %d (made as %d)' % (self._commands, self._moves, self._merged_moves),
+        ]
+        if self._errors:
+            lines.append('errors: %d - ' % sum(self._errors.values()) +
+                         ', '.join('%s (%d)' % (message, count) for message, count in self._errors.items()))
+        lines.append('time: %.3f s' % elapsed)
+        print('\n'.join(lines), file=self._output)
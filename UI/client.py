@@ -0,0 +1,159 @@
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+
+'''
+The client speaks the protocol of the server (see 'UI.server'): it sends a command, waits for the answer, and keeps
+its own copy of the board up to date with the cells the server sends, so it never needs the whole board again.
+
+Run as a program, it is a load test: it opens many sessions at once, and every session sends random commands,
+one after the other, as a player would: 'rate' commands a second on average, at random moments (or as fast as the
+server answers, with a rate of 0). At the end it prints the latency of the commands (the time from sending a command
+until its answer arrives):
+    python -m UI.server --unix /tmp/snake.sock
+    python -m UI.client --unix /tmp/snake.sock --sessions 10000 --commands 20 --rate 1
+With a rate of 0, every command waits for all the commands sent before it by the other sessions, so the latency
+shows how long the queue gets, rather than how long a command takes.
+'''
+COMMANDS = ['move', 'move', 'move 2', 'up', 'down', 'left', 'right']
+
+
+class GameClient:
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._cells = {}    # the cells of the board which aren't empty: (row, column) -> value
+        self._dimensions = (0, 0)
+        self._seed = 0
+
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=8765, path=None):
+        """
+        Function used to open a session on the server
+        :return: the GameClient, after the server has sent the first board
+        """
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        client = cls(reader, writer)
+        client.apply(await client.receive())
+        return client
+
+    def get_cells(self):
+        return self._cells
+
+    def get_dimensions(self):
+        return self._dimensions
+
+    def get_seed(self):
+        return self._seed
+
+    async def receive(self):
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("The server closed the session!")
+        return line.decode().rstrip('\n')
+
+    async def command(self, text):
+        """
+        Function used to send a command and to wait for its answer
+        :param text: the command
+        :return: the answer of the server
+        """
+        self._writer.write((text + '\n').encode())
+        answer = await self.receive()
+        self.apply(answer)
+        return answer
+
+    def apply(self, answer):
+        """
+        Function used to bring the copy of the board up to date with an answer of the server
+        :param answer: the answer
+        :return: -
+        """
+        parts = answer.split(' ', 4)
+        if parts[0] == 'state':
+            self._dimensions = (int(parts[1]), int(parts[2]))
+            self._seed = int(parts[3])
+            self._cells = {}
+            self.apply_cells(parts[4])
+        elif parts[0] in ('ok', 'over'):
+            self.apply_cells(parts[1])
+
+    def apply_cells(self, cells):
+        if cells == '-':
+            return
+        for cell in cells.split(','):
+            row, column, value = cell.split(':')
+            if value == '0':
+                self._cells.pop((int(row), int(column)), None)
+            else:
+                self._cells[(int(row), int(column))] = int(value)
+
+    async def close(self):
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def play(client, commands, rate, rng, latencies):
+    """
+    Function used by the load test to send random commands in a session
+    :return: -
+    """
+    for _ in range(commands):
+        if rate:
+            await asyncio.sleep(rng.expovariate(rate))
+        started = time.perf_counter()
+        answer = await client.command(rng.choice(COMMANDS))
+        latencies.append(time.perf_counter() - started)
+        if answer.startswith('over'):
+            await client.command('new')
+
+
+async def load_test(sessions, commands, rate, host, port, path, seed):
+    """
+    Function used to open many sessions and to send commands in all of them at the same time
+    :return: a sorted list with the latencies of all the commands, in seconds
+    """
+    clients = []
+    for start in range(0, sessions, 500):
+        clients += await asyncio.gather(*[GameClient.connect(host, port, path)
+                                          for _ in range(start, min(sessions, start + 500))])
+    latencies = []
+    rng = random.Random(seed)
+    await asyncio.gather(*[play(client, commands, rate, random.Random(rng.random()), latencies) for client in clients])
+    await asyncio.gather(*[client.close() for client in clients])
+    return sorted(latencies)
+
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description='Load test of the snake server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='connect to this Unix socket instead of TCP')
+    parser.add_argument('--sessions', type=int, default=100)
+    parser.add_argument('--commands', type=int, default=100, help='commands sent in every session')
+    parser.add_argument('--rate', type=float, default=0.0, help='commands a second in every session (0: no pause)')
+    parser.add_argument('--seed', type=int, default=2021)
+    options = parser.parse_args(arguments)
+    started = time.perf_counter()
+    latencies = asyncio.run(load_test(options.sessions, options.commands, options.rate, options.host, options.port,
+                                      options.unix, options.seed))
+    elapsed = time.perf_counter() - started
+    count = len(latencies)
+    print('%d sessions, %d commands in %.2f s (%.0f commands/s)' % (options.sessions, count, elapsed, count / elapsed))
+    print('latency: p50 %.3f ms, p99 %.3f ms, max %.3f ms' % (latencies[count // 2] * 1000,
+                                                               latencies[min(count - 1, count * 99 // 100)] * 1000,
+                                                               latencies[-1] * 1000))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,197 @@
+import asyncio
+import os
+import sys
+from collections import deque
+from time import perf_counter
+from Entities.board import BoardError
+from Service.service import ServiceError
+from UI.renderer import PlainRenderer
+
+try:
+    import termios
+    import tty
+except ImportError:     # not a POSIX system, so the terminal can't be switched to single keys
+    termios = None
+
+
+'''
+The real-time mode moves the snake by itself, one cell on every tick, while the keys turn it.
+
+The loop keeps a fixed schedule: the tick n is due at start + n / tick_rate, whatever happened before it.
+    - on every tick, the oldest key pressed since the last tick turns the snake (a key pressed while the snake
+      can't turn that way is dropped), then the snake moves one cell, through the Service
+    - after a tick, the board is drawn only if the next tick isn't due yet; otherwise the frame is skipped, so a
+      slow renderer never slows down the snake, it only makes the picture less smooth
+    - a tick which starts more than a whole tick late is counted as missed (the simulation still makes it, so the
+      snake keeps its speed, but the board size can't hold that tick rate)
+The keys are read without blocking, by the event loop, whenever the terminal has some input:
+    the arrows or 'w', 'a', 's', 'd' turn the snake, 'q' ends the game.
+When the input can't be watched by the event loop (a regular file, or /dev/null), the game runs without any keys.
+
+At the end, the loop reports the ticks, the missed ticks, the drawn and skipped frames and the frame time.
+'''
+KEYS = {
+    b'\x1b[A': 'up', b'\x1b[B': 'down', b'\x1b[C': 'right', b'\x1b[D': 'left',
+    b'w': 'up', b's': 'down', b'd': 'right', b'a': 'left',
+}
+QUIT_KEY = b'q'
+MAX_PENDING_KEYS = 3
+
+
+class RealtimeUI:
+    def __init__(self, board, service, renderer=None, stats=None, tick_rate=30, input_stream=sys.stdin):
+        """
+        Creates the real-time loop of a game
+        :param board: the Board
+        :param service: the Service of the board
+        :param renderer: the renderer which draws the board (by default, the whole board is printed every frame)
+        :param stats: if a Stats object is given, the ticks and the frames are also recorded in it
+        :param tick_rate: the number of ticks (moves of the snake) every second
+        :param input_stream: the stream from which the keys are read
+        """
+        self._board = board
+        self._service = service
+        self._renderer = renderer if renderer is not None else PlainRenderer(board)
+        self._stats = stats
+        self._tick_period = 1 / tick_rate
+        self._input = input_stream
+        self._pending = deque(maxlen=MAX_PENDING_KEYS)  # the directions pressed since the last tick
+        self._key_buffer = b''
+        self._done = False
+        self._message = ''
+        self._ticks = 0
+        self._missed_ticks = 0
+        self._frames = 0
+        self._skipped_frames = 0
+        self._frame_time = 0.0
+        self._longest_frame = 0.0
+
+    def read_keys(self):
+        """
+        Function called by the event loop when there are keys to read
+        :return: -
+        """
+        data = os.read(self._input.fileno(), 1024)
+        if not data:
+            # The input was closed, so the snake goes on without any more turns
+            asyncio.get_running_loop().remove_reader(self._input.fileno())
+            return
+        self._key_buffer += data
+        while self._key_buffer:
+            if self._key_buffer.startswith(b'\x1b'):
+                if len(self._key_buffer) < 3:
+                    return  # the rest of the arrow's code hasn't arrived yet
+                key, self._key_buffer = self._key_buffer[:3], self._key_buffer[3:]
+            else:
+                key, self._key_buffer = self._key_buffer[:1].lower(), self._key_buffer[1:]
+            if key == QUIT_KEY:
+                self._done = True
+            elif key in KEYS:
+                self._pending.append(KEYS[key])
+
+    def tick(self):
+        """
+        Function used to make one step of the game: the first pending turn, then one move
+        :return: -
+        """
+        if self._pending:
+            try:
+                self._service.change_direction(self._pending.popleft())
+            except ServiceError:
+                pass
+        try:
+            self._service.move_snake(1)
+        except BoardError as error:
+            self._message = str(error)
+            self._done = True
+        self._ticks += 1
+
+    def draw(self):
+        started = perf_counter()
+        self._renderer.render()
+        frame_time = perf_counter() - started
+        self._frames += 1
+        self._frame_time += frame_time
+        self._longest_frame = max(self._longest_frame, frame_time)
+        if self._stats is not None:
+            self._stats.add_time('frame', frame_time)
+
+    async def run(self):
+        """
+        The loop of the game, which runs until the snake hits something or 'q' is pressed
+        :return: -
+        """
+        loop = asyncio.get_running_loop()
+        period = self._tick_period
+        self.draw()
+        started = loop.time()
+        while not self._done:
+            tick_time = started + self._ticks * period
+            delay = tick_time - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                if -delay > period:
+                    self._missed_ticks += 1
+                    if self._stats is not None:
+                        self._stats.count('missed_ticks')
+                # We are behind the schedule, but the keys still have to be read between the ticks
+                await asyncio.sleep(0)
+            if self._done:
+                break
+            self.tick()
+            if loop.time() < started + self._ticks * period:
+                self.draw()
+            else:
+                self._skipped_frames += 1
+                if self._stats is not None:
+                    self._stats.count('skipped_frames')
+        self.draw()
+
+    def start(self):
+        """
+        Function used to play the game in real time, with the terminal reading single keys
+        :return: -
+        """
+        print("Welcome to a game of  S N E K  (arrows or w/a/s/d to turn, q to quit)")
+        file_descriptor = self._input.fileno()
+        terminal_settings = None
+        if termios is not None and self._input.isatty():
+            # The terminal hands over every key as soon as it is pressed, without showing it
+            terminal_settings = termios.tcgetattr(file_descriptor)
+            tty.setcbreak(file_descriptor)
+        try:
+            asyncio.run(self.main())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if terminal_settings is not None:
+                termios.tcsetattr(file_descriptor, termios.TCSADRAIN, terminal_settings)
+            self._renderer.close()
+        if self._message:
+            print(self._message)
+        print(self.report())
+
+    async def main(self):
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_reader(self._input.fileno(), self.read_keys)
+        except OSError:
+            # The input can't be watched by the event loop (e.g. a regular file or /dev/null), so the snake goes on
+            # without any turns, as after the end of the input
+            pass
+        try:
+            await self.run()
+        finally:
+            loop.remove_reader(self._input.fileno())
+
+    def report(self):
+        """
+        Function to describe how well the loop kept its tick rate
+        :return: a string with the ticks, the missed ticks, the frames and the frame time
+        """
+        mean_frame = self._frame_time / self._frames if self._frames else 0.0
+        return '%d ticks at %.0f per second, %d missed\n%d frames drawn, %d skipped, frame time %.2f ms (max %.2f ms, ' \
+               'budget %.2f ms)' % (self._ticks, 1 / self._tick_period, self._missed_ticks, self._frames,
+                                    self._skipped_frames, mean_frame * 1000, self._longest_frame * 1000,
+                                    self._tick_period * 1000)
@@ -0,0 +1,214 @@
+import shutil
+import sys
+
+
+'''
+The renderers are used by the UI to display the board before every command.
+
+The 'PlainRenderer' simply prints the whole board every time, the same way the game always did.
+
+The 'TerminalRenderer' draws the whole board only once (at the start, or when the terminal is resized), at the top of
+the screen, and then keeps the lines below it as a scrolling region for the prompt and the messages of the game.
+After that, it only rewrites the cells which changed since the last frame, moving the cursor directly to each of them
+with ANSI escape codes, so the output of a move has a few bytes for every changed cell, no matter how big the board is.
+
+The position of a cell on the screen comes from the layout of the table:
+    +---+---+---+      - line 1
+    |   | . |   |      - line 2, the cell (0, 1) is in the 7th column
+    +---+---+---+      - line 3
+    | + |   |   |      - line 4, the cell (1, 0) is in the 3rd column
+    +---+---+---+
+Therefore, the cell (row, column) is on the line 2 * row + 2, in the column 4 * column + 3.
+If the board doesn't fit in the terminal, it is printed whole every time, like the 'PlainRenderer' does.
+
+The 'ViewportRenderer' is meant for boards too big to be drawn whole: it only draws a window of 'width' x 'height'
+cells with the snake's head in the middle, so the window moves with the head, and the cells outside the board are
+drawn as walls ('#'), so the edge shows up as soon as it is in the window. Next to the window, a minimap shows the
+whole board scaled down: every character stands for a block of cells, and shows the most important thing in it
+(the head '+', the body '*', an apple '.'), with ':' for the blocks seen in the window.
+Example (a 5 x 3 window on a 7 x 7 board, with the head on the first row, and the minimap):
+    +---+---+---+---+---+   #########
+    | # | # | # | # | # |   # :.+:: #
+    +---+---+---+---+---+   # ::*:: #
+    |   | . | + |   |   |   #   *   #
+    +---+---+---+---+---+   #     . #
+    |   |   | * |   |   |   #       #
+    +---+---+---+---+---+   #       #
+                            #      .#
+                            #########
+    head at (0, 3) on a 7 x 7 board
+The minimap is built from the snake and the apples, so neither the window nor the minimap goes over the whole board,
+and a frame costs the same on a board of any size (the window's cells, plus one step for every body part and apple).
+'''
+WALL = '#'
+class PlainRenderer:
+    def __init__(self, board, stream=sys.stdout):
+        self._board = board
+        self._stream = stream
+
+    def render(self):
+        print(self._board, file=self._stream)
+
+    def close(self):
+        pass
+
+
+class TerminalRenderer:
+    def __init__(self, board, stream=sys.stdout):
+        self._board = board
+        self._stream = stream
+        self._frame = None  # the symbols drawn in the last frame, row by row
+        self._terminal_size = None
+        self._board.track_changes()
+
+    def render(self):
+        """
+        Function used to bring the board on the screen up to date
+        :return: -
+        """
+        terminal_size = shutil.get_terminal_size()
+        if self._frame is None or terminal_size != self._terminal_size:
+            self._terminal_size = terminal_size
+            self.redraw()
+        else:
+            self.draw_changes()
+
+    def redraw(self):
+        """
+        Function used to draw the whole board at the top of the screen and to set the scrolling region below it
+        :return: -
+        """
+        rows, columns = self._board.get_dimensions()
+        self._board.pop_changed_cells()
+        board_height = 2 * rows + 1
+        if board_height >= self._terminal_size.lines or 4 * columns + 1 > self._terminal_size.columns:
+            # The board doesn't fit on the screen, so it can't stay in place and has to be printed whole every time
+            self._frame = None
+            print(self._board, file=self._stream)
+            return
+        self._frame = [[self._board.get_symbol(row, column) for column in range(columns)] for row in range(rows)]
+        # \x1b[H\x1b[2J clears the screen, \x1b[<top>;<bottom>r sets the scrolling region below the board
+        self._stream.write('\x1b[H\x1b[2J' + str(self._board) + '\n')
+        self._stream.write('\x1b[%d;%dr\x1b[%d;1H' % (board_height + 1, self._terminal_size.lines, board_height + 1))
+        self._stream.flush()
+
+    def draw_changes(self):
+        """
+        Function used to rewrite only the cells that changed since the last frame
+        :return: -
+        """
+        output = []
+        for row, column in self._board.pop_changed_cells():
+            symbol = self._board.get_symbol(row, column)
+            if self._frame[row][column] != symbol:
+                self._frame[row][column] = symbol
+                output.append('\x1b[%d;%dH%s' % (2 * row + 2, 4 * column + 3, symbol))
+        if output:
+            # \x1b7 and \x1b8 save and restore the cursor, so the prompt stays where it was
+            self._stream.write('\x1b7' + ''.join(output) + '\x1b8')
+            self._stream.flush()
+
+    def close(self):
+        """
+        Function used to give the whole screen back to the terminal when the game ends
+        :return: -
+        """
+        self._stream.write('\x1b[r')
+        self._stream.flush()
+
+
+class ViewportRenderer:
+    def __init__(self, board, width=41, height=21, minimap_width=21, minimap_height=11, stream=sys.stdout):
+        """
+        Creates a renderer which only draws a window around the snake's head
+        :param board: the Board
+        :param width: the number of columns in the window
+        :param height: the number of rows in the window
+        :param minimap_width: the maximum width of the minimap (0 for no minimap)
+        :param minimap_height: the maximum height of the minimap (0 for no minimap)
+        :param stream: the stream on which the frames are written
+        """
+        self._board = board
+        self._width = width
+        self._height = height
+        self._stream = stream
+        rows, columns = board.get_dimensions()
+        self._minimap = minimap_width > 0 and minimap_height > 0
+        # Every character of the minimap stands for a block of block_rows x block_columns cells
+        self._block_rows = -(-rows // max(minimap_height, 1))
+        self._block_columns = -(-columns // max(minimap_width, 1))
+        self._border = '+' + '---+' * width
+
+    def render(self):
+        print(self.draw(), file=self._stream)
+
+    def close(self):
+        pass
+
+    def get_window(self):
+        """
+        Function to determine which cells are in the window
+        :return: the first row and the first column of the window
+        """
+        head_x, head_y = self._board.get_snake_head()
+        return head_x - self._height // 2, head_y - self._width // 2
+
+    def draw(self):
+        """
+        Function used to build the text of a frame: the window, with the minimap on its right
+        :return: the text
+        """
+        board = self._board
+        rows, columns = board.get_dimensions()
+        top, left = self.get_window()
+        first_column = max(left, 0)
+        last_column = min(left + self._width, columns)
+        lines = [self._border]
+        for row in range(top, top + self._height):
+            if 0 <= row < rows:
+                symbols = [WALL] * (first_column - left) + \
+                          [board.get_symbol(row, column) for column in range(first_column, last_column)] + \
+                          [WALL] * (left + self._width - max(last_column, first_column))
+            else:
+                symbols = [WALL] * self._width
+            lines.append('| ' + ' | '.join(symbols) + ' |')
+            lines.append(self._border)
+        if self._minimap:
+            minimap = self.draw_minimap(top, left)
+            for index, minimap_line in enumerate(minimap):
+                if index < len(lines):
+                    lines[index] += '   ' + minimap_line
+                else:
+                    lines.append(' ' * len(self._border) + '   ' + minimap_line)
+        head_x, head_y = board.get_snake_head()
+        lines.append('head at (%d, %d) on a %d x %d board' % (head_x, head_y, rows, columns))
+        return '\n'.join(lines)
+
+    def draw_minimap(self, top, left):
+        """
+        Function used to build the minimap of the board
+        :param top: the first row of the window
+        :param left: the first column of the window
+        :return: a list with the lines of the minimap (with a wall around it)
+        """
+        rows, columns = self._board.get_dimensions()
+        block_rows = self._block_rows
+        block_columns = self._block_columns
+        height = -(-rows // block_rows)
+        width = -(-columns // block_columns)
+        minimap = [[' '] * width for _ in range(height)]
+        # The blocks seen in the window
+        for block_row in range(max(top, 0) // block_rows, (min(top + self._height, rows) - 1) // block_rows + 1):
+            for block_column in range(max(left, 0) // block_columns,
+                                      (min(left + self._width, columns) - 1) // block_columns + 1):
+                minimap[block_row][block_column] = ':'
+        # Then the apples and the snake, each one over what was drawn before it
+        for row, column in self._board.get_apples():
+            minimap[row // block_rows][column // block_columns] = '.'
+        snake = self._board.get_snake()
+        for row, column in snake:
+            minimap[row // block_rows][column // block_columns] = '*'
+        head_x, head_y = snake[0]
+        minimap[head_x // block_rows][head_y // block_columns] = '+'
+        wall = WALL * (width + 2)
+        return [wall] + [WALL + ''.join(line) + WALL for line in minimap] + [wall]
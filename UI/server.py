@@ -0,0 +1,342 @@
+import argparse
+import asyncio
+import random
+import sys
+from Entities.board import Board, BoardError, SYMBOLS, max_apples
+from Service.service import Service, ServiceError
+
+
+'''
+The server holds many games in one process, one session (a Board with its Service) for every connection, on a local
+TCP port or a Unix socket.
+
+The protocol is made of lines of text. The client sends the commands of the game, and one more:
+    move [n], auto [n], up, down, left, right, exit
+    new [dim] [apples] [seed]       - start a new game (by default, with the server's settings and a random seed)
+    state                           - ask for the whole board again
+The server answers every command with exactly one line:
+    state <rows> <columns> <seed> <cells>   - sent when the connection opens, and after 'new' and 'state'
+    ok <cells>                              - the command was carried out
+    over <cells> <message>                  - the snake hit something; only 'new', 'state' and 'exit' work after it
+    error <message>                         - the command was wrong, and nothing changed
+    bye                                     - the answer to 'exit' (the connection is closed after it)
+where <cells> are the cells which changed, as 'row:column:value' separated by ',' ('-' if there are none), with the
+values of the board: -1 apple, 0 empty, 1 head, 2 body. In 'state', the cells are all the ones which aren't empty.
+
+Example:
+    <- state 7 7 42 0:3:-1,2:3:1,3:3:2,4:3:2
+    -> move 2
+    <- ok 0:3:1,1:3:2,2:3:2,3:3:0,4:3:0,6:1:-1
+
+The connections are served by an asyncio.Protocol ('SessionProtocol') rather than by a coroutine for every client,
+so a command costs one callback of the event loop: the commands run as soon as they arrive, and all the sessions
+share one event loop in one process.
+
+The limits which keep one session from hurting the others:
+    - a session which didn't send anything for 'idle_timeout' seconds is closed (checked every few seconds)
+    - every session has a memory budget; the memory of a board is estimated from its size, its snake and the
+      autopilot's distance field, a 'new' board which doesn't fit is refused, and a session which outgrows its budget
+      is closed (and so is a session whose client doesn't read its answers, once they would take more than that)
+    - a line longer than MAX_LINE, or an 'auto' with more than MAX_AUTO_STEPS steps, is refused
+'''
+MAX_LINE = 256
+MAX_AUTO_STEPS = 1000
+# The estimated memory of a session (in bytes), measured with tracemalloc on the list engine
+SESSION_BYTES = 8192
+BYTES_PER_CELL = 32
+AUTOPILOT_BYTES_PER_CELL = 10
+BYTES_PER_SNAKE_PART = 80
+
+
+class Session:
+    __slots__ = ('board', 'service', 'seed', 'over', 'uses_autopilot', 'last_active', 'transport')
+
+    def __init__(self, board, service, seed, transport=None):
+        self.board = board
+        self.service = service
+        self.seed = seed
+        self.over = False
+        self.uses_autopilot = False
+        self.last_active = 0.0
+        self.transport = transport
+
+
+class SessionProtocol(asyncio.Protocol):
+    """
+    The connection of a session: it splits what arrives into lines and gives them to the server all at once, so the
+    answers to the commands which arrived together are also sent together
+    """
+    def __init__(self, server):
+        self._server = server
+        self._session = None
+        self._buffer = b''
+
+    def connection_made(self, transport):
+        self._session = self._server.open_session(transport)
+
+    def data_received(self, data):
+        lines = (self._buffer + data).split(b'\n')
+        self._buffer = lines.pop()
+        if len(self._buffer) > MAX_LINE or any(len(line) > MAX_LINE for line in lines):
+            self._server.close_session(self._session, 'The line is too long!')
+        elif lines:
+            self._server.handle_lines(self._session, lines)
+
+    def connection_lost(self, exc):
+        self._server.close_session(self._session)
+
+
+def format_cells(board, cells):
+    """
+    Function to describe some cells of a board for the protocol
+    :param board: the Board
+    :param cells: the coordinates of the cells
+    :return: a string like '2:3:1,3:3:2', or '-' if there are no cells
+    """
+    if not cells:
+        return '-'
+    return ','.join(['%d:%d:%d' % (row, column, SYMBOLS.index(board.get_symbol(row, column)) - 1)
+                     for row, column in cells])
+
+
+class GameServer:
+    def __init__(self, dimension=7, apples=3, idle_timeout=300.0, memory_limit=1 << 20, engine='list'):
+        """
+        Creates a server, which doesn't listen yet (see 'serve')
+        :param dimension: the dimension of the boards of the new sessions
+        :param apples: the number of apples of the new sessions
+        :param idle_timeout: the number of seconds after which a silent session is closed
+        :param memory_limit: the memory budget of a session, in bytes
+        :param engine: the engine of the boards
+        """
+        if self.estimate_memory(dimension, 3, False) > memory_limit:
+            raise ValueError("The boards of the sessions don't fit in the memory limit!")
+        if dimension < 3:
+            raise ValueError('The boards need at least 3 rows!')
+        if not 0 <= apples <= max_apples(dimension, dimension):
+            raise ValueError('Between 0 and %d apples always fit on a %d x %d board!' %
+                             (max_apples(dimension, dimension), dimension, dimension))
+        self._dimension = dimension
+        self._apples = apples
+        self._idle_timeout = idle_timeout
+        self._memory_limit = memory_limit
+        self._engine = engine
+        self._sessions = set()
+        self._evicted = 0
+
+    def get_session_count(self):
+        return len(self._sessions)
+
+    def get_evicted_count(self):
+        return self._evicted
+
+    def estimate_memory(self, dimension, snake_length, uses_autopilot):
+        """
+        Function to estimate how much memory a session takes
+        :param dimension: the dimension of the board
+        :param snake_length: the length of the snake
+        :param uses_autopilot: True if the session has used 'auto' (which keeps a distance field of the board)
+        :return: the number of bytes
+        """
+        per_cell = BYTES_PER_CELL + (AUTOPILOT_BYTES_PER_CELL if uses_autopilot else 0)
+        return SESSION_BYTES + dimension * dimension * per_cell + snake_length * BYTES_PER_SNAKE_PART
+
+    def new_game(self, session, dimension, apples, seed):
+        """
+        Function used to start a new game in a session
+        :return: the answer for the client
+        """
+        if self.estimate_memory(dimension, 3, False) > self._memory_limit:
+            return 'error The board is too big for the memory limit!'
+        try:
+            board = Board(dimension, apples, self._engine, random.Random(seed))
+        except BoardError as be:
+            return 'error ' + str(be)
+        board.track_changes()
+        board.pop_changed_cells()
+        session.board = board
+        session.service = Service(board)
+        session.seed = seed
+        session.over = False
+        session.uses_autopilot = False
+        return self.describe(session)
+
+    def describe(self, session):
+        board = session.board
+        rows, columns = board.get_dimensions()
+        cells = list(board.get_snake()) + list(board.get_apples())
+        return 'state %d %d %d %s' % (rows, columns, session.seed, format_cells(board, cells))
+
+    def handle_command(self, session, line):
+        """
+        Function used to carry out a command of a session
+        :param session: the Session
+        :param line: the command, as the client sent it
+        :return: the answer for the client (one line, without the end of line)
+        """
+        parts = line.split()
+        command_word = parts[0].lower() if parts else ''
+        parameters = parts[1:]
+        if command_word == 'exit':
+            return 'bye'
+        if command_word == 'state':
+            return self.describe(session)
+        if command_word == 'new':
+            try:
+                numbers = [int(parameter) for parameter in parameters[:3]]
+            except ValueError as ve:
+                return 'error ' + str(ve)
+            dimension = numbers[0] if len(numbers) > 0 else self._dimension
+            apples = numbers[1] if len(numbers) > 1 else self._apples
+            seed = numbers[2] if len(numbers) > 2 else random.randrange(2 ** 63)
+            if dimension < 3 or apples < 0:
+                return 'error The board needs at least 3 rows and a natural number of apples!'
+            if apples > max_apples(dimension, dimension):
+                return 'error At most %d apples always fit on this board!' % max_apples(dimension, dimension)
+            return self.new_game(session, dimension, apples, seed)
+        if session.over:
+            return "error The game is over, start a new one with 'new'!"
+        board = session.board
+        try:
+            if command_word in ('move', 'auto'):
+                steps = int(parameters[0]) if parameters else 1
+                if command_word == 'move':
+                    session.service.move_snake(steps)
+                elif steps > MAX_AUTO_STEPS:
+                    return 'error The autopilot makes at most %d steps at once!' % MAX_AUTO_STEPS
+                else:
+                    session.uses_autopilot = True
+                    session.service.auto_move(steps)
+            elif command_word in ('up', 'down', 'left', 'right'):
+                session.service.change_direction(command_word)
+            else:
+                return 'error bad command'
+        except (ServiceError, ValueError) as error:
+            board.pop_changed_cells()
+            return 'error ' + str(error)
+        except BoardError as be:
+            session.over = True
+            return 'over %s %s' % (format_cells(board, board.pop_changed_cells()), be)
+        return 'ok ' + format_cells(board, board.pop_changed_cells())
+
+    def within_memory_limit(self, session):
+        rows, columns = session.board.get_dimensions()
+        return self.estimate_memory(max(rows, columns), session.board.long_snake(),
+                                    session.uses_autopilot) <= self._memory_limit
+
+    def open_session(self, transport):
+        """
+        Function used to start the session of a new connection, with a new game
+        :param transport: the transport of the connection
+        :return: the Session
+        """
+        session = Session(None, None, 0, transport)
+        session.last_active = asyncio.get_running_loop().time()
+        self._sessions.add(session)
+        answer = self.new_game(session, self._dimension, self._apples, random.randrange(2 ** 63))
+        if session.board is None:
+            # The first game couldn't start, so there is nothing the session could do
+            self.close_session(session, answer[len('error '):])
+        else:
+            transport.write((answer + '\n').encode())
+        return session
+
+    def close_session(self, session, message=None):
+        """
+        Function used to end a session, telling the client why (if it isn't the client who left)
+        :param session: the Session
+        :param message: the reason, sent as an error before closing the connection
+        :return: -
+        """
+        if session in self._sessions:
+            self._sessions.discard(session)
+            if message is not None:
+                self._evicted += 1
+                session.transport.write(('error ' + message + '\n').encode())
+            session.transport.close()
+
+    def handle_lines(self, session, lines):
+        """
+        Function used to carry out the commands which arrived together on a connection
+        :param session: the Session
+        :param lines: the commands, as bytes without the end of line
+        :return: -
+        """
+        if session not in self._sessions:
+            return
+        session.last_active = asyncio.get_running_loop().time()
+        answers = []
+        for line in lines:
+            answer = self.handle_command(session, line.decode(errors='replace'))
+            answers.append(answer)
+            if answer == 'bye' or not self.within_memory_limit(session):
+                break
+        session.transport.write(('\n'.join(answers) + '\n').encode())
+        if answers[-1] == 'bye':
+            self.close_session(session)
+        elif not self.within_memory_limit(session):
+            self.close_session(session, 'The session went over its memory limit!')
+        elif session.transport.get_write_buffer_size() > self._memory_limit:
+            # The client doesn't read its answers, and they would take more memory than the whole session may
+            self.close_session(session, 'The session went over its memory limit!')
+
+    async def evict_idle_sessions(self):
+        """
+        The task which closes the sessions which have been silent for too long
+        :return: -
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(min(5.0, self._idle_timeout / 4))
+            oldest_allowed = loop.time() - self._idle_timeout
+            for session in [session for session in self._sessions if session.last_active < oldest_allowed]:
+                self.close_session(session, 'The session was closed after being idle for too long!')
+
+    async def serve(self, host='127.0.0.1', port=8765, path=None, ready=None):
+        """
+        Function which runs the server until it is cancelled
+        :param host: the address to listen on (with TCP)
+        :param port: the port to listen on (with TCP)
+        :param path: the path of a Unix socket to listen on instead of TCP
+        :param ready: (optional) an asyncio.Event which is set when the server is listening
+        :return: -
+        """
+        loop = asyncio.get_running_loop()
+        if path is not None:
+            server = await loop.create_unix_server(lambda: SessionProtocol(self), path, backlog=4096)
+        else:
+            server = await loop.create_server(lambda: SessionProtocol(self), host, port, backlog=4096)
+        evictor = asyncio.ensure_future(self.evict_idle_sessions())
+        if ready is not None:
+            ready.set()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            evictor.cancel()
+
+
+def main(arguments):
+    parser = argparse.ArgumentParser(description='Serve many games of snake on a local socket')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='listen on this Unix socket instead of TCP')
+    parser.add_argument('--dim', type=int, default=7)
+    parser.add_argument('--apples', type=int, default=3)
+    parser.add_argument('--idle-timeout', type=float, default=300.0, help='seconds')
+    parser.add_argument('--memory-limit', type=int, default=1 << 20, help='bytes for every session')
+    parser.add_argument('--engine', default='list', choices=['list', 'numpy', 'auto'])
+    options = parser.parse_args(arguments)
+    try:
+        server = GameServer(options.dim, options.apples, options.idle_timeout, options.memory_limit, options.engine)
+    except ValueError as ve:
+        parser.error(str(ve))
+    try:
+        asyncio.run(server.serve(options.host, options.port, options.unix))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
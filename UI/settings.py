@@ -0,0 +1,266 @@
+import argparse
+import math
+import os
+from importlib.util import find_spec
+from Entities.board import max_apples
+
+
+'''
+The settings of the game come from three places, each one overriding the ones before it:
+    - the settings file ('settings.txt' by default, or the one given with SNAKE_SETTINGS or --settings)
+    - the environment variables, named SNAKE_ and the name of the setting (e.g. SNAKE_APPLES=5, SNAKE_DIM=9)
+    - the command line (e.g. 'python main.py --rows 9 --columns 15 --apples 5')
+
+The settings file can hold the numbers of the old format on its first line, 'DIM apple_count', which can be followed
+by the width and height of the viewport and by the width and height of the minimap; the lines after it (or all the
+lines) can set any setting as 'name = value', and '#' starts a comment:
+    7 10
+    engine = list
+    seed = 42
+
+The settings:
+    dim             - the number of rows and of columns (rows, columns - to set them apart)
+    apples          - the number of apples
+    engine          - list, numpy, auto (NumPy when it is installed) or sparse (see 'SparseBoard')
+    render          - auto (the terminal renderer in a terminal, the plain one otherwise, or the viewport for a sparse
+                      board or one with more than MAX_DRAWN_CELLS cells), terminal, plain or viewport
+    viewport        - the width and height of the viewport, e.g. '41 21' (it also turns the viewport renderer on, unless
+                      another renderer was chosen)
+    minimap         - the width and height of the viewport's minimap ('0 0' for none)
+    seed            - the seed of the apples (a random one when it isn't given), a 64-bit signed number
+    realtime        - the ticks per second of the real-time mode (0 for the game with commands)
+    batch           - a script of commands to run in the batch mode ('-' for the standard input)
+    render_every    - in the batch mode, draw the board after every that many commands (0 only at the end)
+    journal         - a path where the commands are recorded (not with the sparse engine, since the replay builds
+                      a Board)
+    stats           - a path where the measurements of the game are saved
+
+Everything is checked before the board is created (see 'validate'), so a wrong setting stops the game at once, with
+a message, instead of failing while the board is built. The apples have to fit on the board whatever cells they are
+placed on (see 'max_apples').
+'''
+DEFAULT_PATH = 'settings.txt'
+ENGINES = ('list', 'numpy', 'auto', 'sparse')
+RENDER_MODES = ('auto', 'terminal', 'plain', 'viewport')
+# The largest board which is drawn whole; a bigger one takes too long to print, so only the viewport can draw it
+MAX_DRAWN_CELLS = 250000
+# The seed is kept in the journal as a 64-bit signed number
+MIN_SEED = -2 ** 63
+MAX_SEED = 2 ** 63 - 1
+
+
+class SettingsError(Exception):
+    def __init__(self, message=''):
+        self._message = message
+
+    def __str__(self):
+        return self._message
+
+
+def to_pair(text):
+    """
+    Function to read two numbers, like '41 21' or '41x21'
+    :param text: the text
+    :return: a tuple with the two numbers
+    """
+    values = text.replace('x', ' ').replace(',', ' ').split()
+    if len(values) != 2:
+        raise ValueError("two numbers are needed, like '41 21'")
+    return int(values[0]), int(values[1])
+
+
+def to_optional_int(text):
+    return None if text.strip().lower() in ('', 'none', 'random') else int(text)
+
+
+# The type of every setting, which turns its text into its value
+CONVERTERS = {
+    'rows': int,
+    'columns': int,
+    'apples': int,
+    'engine': str.lower,
+    'render': str.lower,
+    'viewport': to_pair,
+    'minimap': to_pair,
+    'seed': to_optional_int,
+    'realtime': float,
+    'batch': str,
+    'render_every': int,
+    'journal': str,
+    'stats': str,
+}
+
+
+class Settings:
+    def __init__(self):
+        # The default settings, used when the file doesn't exist and nothing else is given
+        self.rows = 7
+        self.columns = 7
+        self.apples = 3
+        self.engine = 'list'
+        self.render = 'auto'
+        self.viewport = (41, 21)
+        self.minimap = (21, 11)
+        self.seed = None
+        self.realtime = 0.0
+        self.batch = None
+        self.render_every = 0
+        self.journal = None
+        self.stats = None
+
+    def set(self, name, text, source):
+        """
+        Function used to change a setting from its text
+        :param name: the name of the setting ('dim' sets both the rows and the columns)
+        :param text: the text of the value
+        :param source: where the value comes from, for the error messages
+        :return: -
+        """
+        name = name.strip().lower().replace('-', '_')
+        text = text.strip()
+        if name == 'dim':
+            self.set('rows', text, source)
+            self.set('columns', text, source)
+            return
+        if name not in CONVERTERS:
+            raise SettingsError('%s: unknown setting %r' % (source, name))
+        try:
+            value = CONVERTERS[name](text)
+        except ValueError as ve:
+            raise SettingsError('%s: %s: %s' % (source, name, ve))
+        setattr(self, name, value)
+        if name == 'viewport' and self.render == 'auto':
+            self.render = 'viewport'
+
+    def validate(self):
+        """
+        Function used to check the settings before anything is built from them
+        :return: -
+        """
+        if self.rows < 3 or self.columns < 1:
+            raise SettingsError('The board needs at least 3 rows and 1 column for the snake (it has %d x %d)!' %
+                                (self.rows, self.columns))
+        if self.apples < 0:
+            raise SettingsError('The number of apples must be a natural number!')
+        limit = max_apples(self.rows, self.columns)
+        if self.apples > limit:
+            raise SettingsError('At most %d apples always fit on a %d x %d board without being adjacent (%d asked)!' %
+                                (limit, self.rows, self.columns, self.apples))
+        if self.engine not in ENGINES:
+            raise SettingsError('Engine non existent: %s (it can be %s)' % (self.engine, ', '.join(ENGINES)))
+        # We only look for NumPy here, it is imported when the board is created
+        if self.engine == 'numpy' and find_spec('numpy') is None:
+            raise SettingsError("The 'numpy' engine needs NumPy to be installed!")
+        if self.render not in RENDER_MODES:
+            raise SettingsError('Render mode non existent: %s (it can be %s)' %
+                                (self.render, ', '.join(RENDER_MODES)))
+        too_big = self.rows * self.columns > MAX_DRAWN_CELLS
+        if self.render == 'auto' and (too_big or self.engine == 'sparse'):
+            self.render = 'viewport'
+        if too_big and self.render != 'viewport':
+            raise SettingsError('A board with more than %d cells can only be drawn with the viewport!' %
+                                MAX_DRAWN_CELLS)
+        if too_big and self.render_every:
+            raise SettingsError('A board with more than %d cells can\'t be drawn in the batch mode!' % MAX_DRAWN_CELLS)
+        if self.engine == 'sparse' and self.journal:
+            raise SettingsError('The journal can\'t be replayed on a sparse board, so it only works with the other '
+                                'engines!')
+        if self.seed is not None and not MIN_SEED <= self.seed <= MAX_SEED:
+            raise SettingsError('The seed must be between %d and %d!' % (MIN_SEED, MAX_SEED))
+        if min(self.viewport) < 1 or min(self.minimap) < 0:
+            raise SettingsError('The viewport needs at least one cell, and the minimap can\'t have a negative size!')
+        if not math.isfinite(self.realtime):
+            raise SettingsError('The ticks per second must be a finite number (%s given)!' % self.realtime)
+        if self.realtime < 0 or self.render_every < 0:
+            raise SettingsError('The ticks per second and the commands between drawings can\'t be negative!')
+        if self.batch is not None and self.batch != '-' and not os.path.isfile(self.batch):
+            raise SettingsError('The script of commands %s doesn\'t exist!' % self.batch)
+
+
+def read_file(settings, path):
+    """
+    Function used to read the settings from a file (see the format above)
+    :param settings: the Settings which are changed
+    :param path: the path of the file
+    :return: -
+    """
+    try:
+        with open(path) as settings_file:
+            lines = settings_file.read().splitlines()
+    except OSError as oe:
+        raise SettingsError('%s: %s' % (path, oe.strerror))
+    for number, line in enumerate(lines, 1):
+        line = line.split('#', 1)[0].strip()
+        source = '%s, line %d' % (path, number)
+        if not line:
+            continue
+        if '=' in line:
+            name, text = line.split('=', 1)
+            settings.set(name, text, source)
+            continue
+        # The numbers of the old format: DIM apple_count [viewport_width viewport_height [minimap_width minimap_height]]
+        values = line.split()
+        if len(values) not in (2, 4, 6):
+            raise SettingsError("%s: expected 'DIM apple_count [viewport [minimap]]' or 'name = value'" % source)
+        settings.set('dim', values[0], source)
+        settings.set('apples', values[1], source)
+        if len(values) >= 4:
+            settings.set('viewport', ' '.join(values[2:4]), source)
+        if len(values) == 6:
+            settings.set('minimap', ' '.join(values[4:6]), source)
+
+
+def read_environment(settings, environment):
+    """
+    Function used to read the settings from the environment variables (SNAKE_ followed by the name of a setting)
+    :param settings: the Settings which are changed
+    :param environment: the environment variables (e.g. os.environ)
+    :return: -
+    """
+    for name in ['dim'] + list(CONVERTERS):
+        variable = 'SNAKE_' + name.upper()
+        if environment.get(variable):
+            settings.set(name, environment[variable], variable)
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(description='A game of snake in the console')
+    parser.add_argument('--settings', help='the settings file (by default %s)' % DEFAULT_PATH)
+    parser.add_argument('--dim', help='the number of rows and of columns')
+    parser.add_argument('--rows')
+    parser.add_argument('--columns')
+    parser.add_argument('--apples')
+    parser.add_argument('--engine', help=', '.join(ENGINES))
+    parser.add_argument('--render', help=', '.join(RENDER_MODES))
+    parser.add_argument('--viewport', nargs=2, metavar=('WIDTH', 'HEIGHT'))
+    parser.add_argument('--minimap', nargs=2, metavar=('WIDTH', 'HEIGHT'))
+    parser.add_argument('--seed')
+    parser.add_argument('--realtime', help='ticks per second')
+    parser.add_argument('--batch', help="a script of commands ('-' for the standard input)")
+    parser.add_argument('--render-every', help='in the batch mode, draw the board after every that many commands')
+    parser.add_argument('--journal', help='record the commands in this file')
+    parser.add_argument('--stats', help='save the measurements of the game in this file')
+    return parser
+
+
+def load_settings(arguments, environment=os.environ):
+    """
+    Function used to gather the settings from the file, the environment and the command line, and to check them
+    :param arguments: the arguments of the command line (without the name of the program)
+    :param environment: the environment variables
+    :return: the Settings
+    """
+    options = vars(create_parser().parse_args(arguments))
+    settings = Settings()
+    path = options.pop('settings') or environment.get('SNAKE_SETTINGS')
+    if path is not None:
+        read_file(settings, path)
+    elif os.path.isfile(DEFAULT_PATH):
+        read_file(settings, DEFAULT_PATH)
+    read_environment(settings, environment)
+    for name in ['dim'] + list(CONVERTERS):
+        value = options.get(name)
+        if value is not None:
+            settings.set(name, ' '.join(value) if isinstance(value, list) else value, '--' + name.replace('_', '-'))
+    settings.validate()
+    return settings
@@ -1,11 +1,17 @@
+from time import perf_counter
 from Entities.board import BoardError
 from Service.service import ServiceError
+from UI.renderer import PlainRenderer
 
 # UI class used to deal with all the user inputs and prints
 class UI:
-    def __init__(self, board, service):
+    def __init__(self, board, service, renderer=None, stats=None):
         self._board = board
         self._service = service
+        # The renderer draws the board before every command (by default, the whole board is printed every time)
+        self._renderer = renderer if renderer is not None else PlainRenderer(board)
+        # If a Stats object is given, the time taken by every command and by drawing the board is recorded in it
+        self._stats = stats
 
     # Function used to separate the string given by the user into (at most) two keywords
     # Example: 'move 4' returns a tuple consisting of the strings 'move' and '4'
@@ -18,6 +24,10 @@ class UI:
     def move_snake(self, steps):
         self._service.move_snake(steps)
 
+    # Calling the Service function for letting the autopilot move the snake, passing the number of steps
+    def auto_move(self, steps):
+        self._service.auto_move(steps)
+
     # Calling the Service function for changing the snake's direction, passing the new direction given by the user
     def change_direction(self, direction):
         self._service.change_direction(direction)
@@ -31,9 +41,16 @@ class UI:
         # The game goes on as long as the snake doesn't hit itself or an edge, or it ends when the user enters the keyword 'exit'
         while not done:
             # Firstly, we print the current state of the board
-            print(self._board)
+            if self._stats is not None:
+                started = perf_counter()
+                self._renderer.render()
+                self._stats.add_time('render', perf_counter() - started)
+            else:
+                self._renderer.render()
             # Then, we get the user's input, and separate the keywords
             command = input("command> ")
+            if self._stats is not None:
+                started = perf_counter()
             command_word, command_parameter = self.command_split(command)
             # Depending on the user's input, we go on a specific branch:
 
@@ -60,6 +77,18 @@ class UI:
                         print(be)
                         done = True
 
+            # Autopilot branch, which works like the move branch, but the snake also turns towards the apples
+            elif command_word == 'auto':
+                try:
+                    self.auto_move(1 if command_parameter == '' else int(command_parameter))
+                except ServiceError as se:
+                    print(se)
+                except ValueError as ve:
+                    print(ve)
+                except BoardError as be:
+                    print(be)
+                    done = True
+
             # Snake change direction branch
             # We check if the keyword is valid, and call the change_direction function in a 'try... except...' block
             # so we can catch any possible errors
@@ -77,4 +106,9 @@ class UI:
             elif command_word == 'exit':
                 done = True
             else:
-                print("bad command")
\ No newline at end of file
+                print("bad command")
+            if self._stats is not None:
+                known_command = command_word in ('move', 'auto') or command_word in directions or command_word == 'exit'
+                self._stats.add_time('command_' + (command_word if known_command else 'other'),
+                                     perf_counter() - started)
+        self._renderer.close()
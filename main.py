@@ -1,17 +1,77 @@
-from Entities.board import Board
-from Service.service import Service
-from UI.ui import UI
+import sys
+from UI.settings import MAX_DRAWN_CELLS, SettingsError, load_settings
+
 
+# The settings come from 'settings.txt', the SNAKE_* environment variables and the command line (see 'UI.settings'),
+# and they are all checked before anything else is loaded, so a wrong setting stops the game at once
+try:
+    settings = load_settings(sys.argv[1:])
+except SettingsError as se:
+    print(se, file=sys.stderr)
+    sys.exit(2)
 
-# Getting the values for 'DIM' and 'apple_count' from the text file
-# The text file only contains two numbers, the values for 'DIM' and 'apple_count'
-settings_file = open("settings.txt", 'r+')
-values = settings_file.read().split()
-DIM = int(values[0])
-apple_count = int(values[1])
+# The modules are only imported when the chosen mode needs them, so the game (and the batch mode) starts faster
+import atexit
+import random
+from Service.service import Service
+if settings.engine == 'sparse':
+    from Entities.sparse_board import SparseBoard as Board
+    engine = 'list'
+else:
+    from Entities.board import Board
+    engine = settings.engine
 
 
-board = Board(DIM, apple_count)
-service = Service(board)
-ui = UI(board, service)
-ui.start()
\ No newline at end of file
+# Every game has its own seed, so it can be recorded in a journal and played again
+seed = settings.seed if settings.seed is not None else random.randrange(2 ** 63)
+board = Board(settings.rows, settings.apples, engine, random.Random(seed), settings.columns)
+# With a journal, every command is recorded there (replay it with 'python -m Service.journal <path>')
+journal = None
+if settings.journal:
+    from Service.journal import JournalWriter
+    journal = JournalWriter(settings.journal, board, seed)
+    atexit.register(journal.close)
+service = Service(board, journal)
+# With stats, the game is measured and the stats are saved there (as JSON) when the program ends
+stats = None
+if settings.stats:
+    from Entities.stats import Stats
+    stats = Stats()
+    board.set_stats(stats)
+    atexit.register(stats.dump, settings.stats)
+if settings.batch:
+    # In the batch mode, the commands are read from a file (or from the standard input, with '-') and only a summary
+    # is printed at the end ('render_every' also draws the board after every that many commands)
+    from UI.batch import BatchRunner
+    runner = BatchRunner(board, service, settings.render_every or None,
+                         show_board=settings.rows * settings.columns <= MAX_DRAWN_CELLS)
+    if settings.batch == '-':
+        runner.run(sys.stdin)
+    else:
+        with open(settings.batch) as script:
+            runner.run(script)
+    sys.exit(0)
+render = settings.render
+if render == 'auto':
+    # In a terminal, only the cells that change are redrawn; otherwise (e.g. when the output goes to a file) the whole
+    # board is printed before every command
+    render = 'terminal' if sys.stdout.isatty() else 'plain'
+if render == 'viewport':
+    # With a viewport, only the cells around the snake's head are drawn (see 'ViewportRenderer')
+    from UI.renderer import ViewportRenderer
+    renderer = ViewportRenderer(board, *settings.viewport, *settings.minimap)
+elif render == 'terminal':
+    from UI.renderer import TerminalRenderer
+    renderer = TerminalRenderer(board)
+else:
+    from UI.renderer import PlainRenderer
+    renderer = PlainRenderer(board)
+# In the real-time mode, the snake moves by itself on every tick and the keys turn it; otherwise, the game waits for a
+# command before every move
+if settings.realtime:
+    from UI.realtime import RealtimeUI
+    ui = RealtimeUI(board, service, renderer, stats, settings.realtime)
+else:
+    from UI.ui import UI
+    ui = UI(board, service, renderer, stats)
+ui.start()
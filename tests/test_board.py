@@ -0,0 +1,56 @@
+import random
+import unittest
+from Entities.board import Board, BoardError, BoardFullError
+
+DIRECTIONS = ([-1, 0], [1, 0], [0, -1], [0, 1])
+
+
+def state_of(board):
+    return (list(board.get_snake()), sorted(board.get_apples()), board.get_direction(), list(board.get_free_cells()),
+            board.get_random().getstate(), str(board), bytes(board._blocked))
+
+
+class BoardTest(unittest.TestCase):
+    def test_apply_and_undo(self):
+        # Every move taken back with 'undo' must leave the board exactly as it was before it, and a move which fails
+        # must leave it untouched
+        for seed in range(30):
+            rng = random.Random(seed)
+            board = Board(8, 6, 'list', random.Random(seed))
+            records = []
+            states = [state_of(board)]
+            for command in range(300):
+                if records and rng.random() < 0.3:
+                    # We take back a few moves, checking the state before every one of them
+                    for back in range(rng.randint(1, len(records))):
+                        board.undo(records.pop())
+                        states.pop()
+                        self.assertEqual(state_of(board), states[-1])
+                    continue
+                direction = rng.choice(DIRECTIONS)
+                if direction == [-value for value in board.get_direction()]:
+                    continue
+                try:
+                    records.append(board.apply(direction))
+                except BoardError:
+                    self.assertEqual(state_of(board), states[-1])
+                    continue
+                states.append(state_of(board))
+            while records:
+                board.undo(records.pop())
+                states.pop()
+                self.assertEqual(state_of(board), states[-1])
+
+    def test_apply_on_a_full_board(self):
+        # The snake fills a 3 x 2 board but for the apple, so eating it leaves no room for a new one: the move fails
+        # and nothing changes
+        board = Board.from_state(3, 2, 1, [-1, 0], [(1, 1), (2, 1), (2, 0), (1, 0), (0, 0)], [(0, 1)],
+                                 rng=random.Random(1))
+        before = state_of(board)
+        with self.assertRaises(BoardFullError):
+            board.apply([-1, 0])
+        self.assertEqual(state_of(board), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import random
+import tempfile
+import unittest
+from Entities.board import Board, BoardError
+from Service.journal import JournalReader, JournalWriter
+from Service.pathfinding import Pathfinder
+from Service.service import Service, ServiceError
+
+
+def state_of(board):
+    return (list(board.get_snake()), sorted(board.get_apples()), board.get_direction(), list(board.get_free_cells()),
+            board.get_random().getstate())
+
+
+class JournalTest(unittest.TestCase):
+    def test_replay_at_every_command(self):
+        # The state after every command of a game must come back from the journal, whichever snapshot it starts from
+        with tempfile.TemporaryDirectory() as directory:
+            for seed in range(8):
+                path = os.path.join(directory, 'game %d.journal' % seed)
+                board = Board(9, 6, 'list', random.Random(seed))
+                journal = JournalWriter(path, board, seed, snapshot_interval=5)
+                service = Service(board, journal)
+                rng = random.Random(seed)
+                states = [state_of(board)]
+                # The autopilot's choice is given as a command of its own, so there is a state after every command
+                commands = []
+                while len(states) < 400:
+                    if not commands:
+                        choice = rng.random()
+                        if choice < 0.6:
+                            commands = [('turn', Pathfinder(board).next_direction()), ('move', 1)]
+                        elif choice < 0.8:
+                            commands = [('turn', rng.choice(['up', 'down', 'left', 'right']))]
+                        else:
+                            commands = [('move', rng.randint(1, 3))]
+                    kind, value = commands.pop(0)
+                    try:
+                        if kind == 'turn':
+                            service.change_direction(value)
+                        else:
+                            service.move_snake(value)
+                    except ServiceError:
+                        pass
+                    except BoardError:
+                        states.append(state_of(board))
+                        break
+                    states.append(state_of(board))
+                journal.close()
+                reader = JournalReader(path)
+                self.assertEqual(reader.get_command_count(), len(states) - 1)
+                for until, state in enumerate(states):
+                    self.assertEqual(state_of(reader.replay(until)), state)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import random
+import unittest
+from importlib.util import find_spec
+from Entities.board import Board, BoardError
+from Service.pathfinding import Pathfinder
+from Service.service import Service, ServiceError
+
+if find_spec('numpy') is not None:
+    from Service.lockstep import LockstepGames
+
+DIRECTION_NAMES = ['up', 'down', 'left', 'right']
+
+
+def state_of(board):
+    return (list(board.get_snake()), sorted(board.get_apples()), board.get_direction(), list(board.get_free_cells()),
+            board.get_random().getstate())
+
+
+def matrix_of(board):
+    rows, columns = board.get_dimensions()
+    matrix = [[0] * columns for row in range(rows)]
+    for row, column in board.get_apples():
+        matrix[row][column] = -1
+    for row, column in board.get_snake():
+        matrix[row][column] = 2
+    head_x, head_y = board.get_snake_head()
+    matrix[head_x][head_y] = 1
+    return matrix
+
+
+@unittest.skipIf(find_spec('numpy') is None, 'the lockstep games need NumPy')
+class LockstepTest(unittest.TestCase):
+    def test_same_games_as_the_boards(self):
+        # Every lockstep game must play exactly like a Board with the same seed, moved through its Service, and start
+        # a new Board with the same generator when it ends
+        seeds = list(range(16))
+        games = LockstepGames(seeds, 7, 3)
+        rngs = [random.Random(seed) for seed in seeds]
+        boards = [Board(7, 3, 'list', rng) for rng in rngs]
+        actions_rng = random.Random(1)
+        for step in range(400):
+            # Mostly the autopilot's direction, so the snakes grow long, and sometimes a random one (or none)
+            actions = [DIRECTION_NAMES.index(Pathfinder(board).next_direction()) if actions_rng.random() < 0.9
+                       else actions_rng.choice([-1, 0, 1, 2, 3]) for board in boards]
+            eats, over = games.step(actions)
+            for game, action in enumerate(actions):
+                board = boards[game]
+                service = Service(board)
+                length = len(board.get_snake())
+                ended = False
+                try:
+                    if action >= 0:
+                        service.change_direction(DIRECTION_NAMES[action])
+                except ServiceError:
+                    pass
+                try:
+                    service.move_snake(1)
+                except BoardError:
+                    ended = True
+                    boards[game] = board = Board(7, 3, 'list', rngs[game])
+                self.assertEqual(bool(over[game]), ended)
+                self.assertEqual(bool(eats[game]), not ended and len(board.get_snake()) == length + 1)
+                self.assertEqual(games.get_matrices()[game].tolist(), matrix_of(board))
+                self.assertEqual(state_of(games.get_board(game)), state_of(board))
+        self.assertGreater(sum(games.get_episodes()), 0)
+        self.assertGreater(max(games.get_scores()), 0)
+
+    def test_board_goes_on_like_the_game(self):
+        # The Board built by 'get_board' must go on exactly like the lockstep game
+        games = LockstepGames([5, 6], 7, 3)
+        for step in range(30):
+            games.step([3 if step % 8 < 4 else 1, -1])
+        board = games.get_board(0)
+        service = Service(board)
+        for step in range(40):
+            action = [2, 0, 3, 1][step // 3 % 4]
+            eats, over = games.step([action, -1])
+            if over[0]:
+                break
+            try:
+                service.change_direction(DIRECTION_NAMES[action])
+            except ServiceError:
+                pass
+            service.move_snake(1)
+            self.assertEqual(state_of(games.get_board(0)), state_of(board))
+
+
+if __name__ == '__main__':
+    unittest.main()
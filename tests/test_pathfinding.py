@@ -0,0 +1,74 @@
+import random
+import unittest
+from Entities.board import Board, BoardError, BoardFullError
+from Service.pathfinding import Pathfinder
+from Service.service import Service, ServiceError
+
+
+def field_of(pathfinder):
+    return list(pathfinder._distances), bytes(pathfinder._blocked), list(pathfinder._snake)
+
+
+class PathfinderTest(unittest.TestCase):
+    def assert_field_is_rebuilt(self, service, board):
+        # The field kept up to date by the autopilot must be the one built from scratch for the same board
+        self.assertEqual(field_of(service._pathfinder), field_of(Pathfinder(board)))
+
+    def test_head_back_on_its_cell(self):
+        board = Board(9, 0, 'list', random.Random(1))
+        service = Service(board)
+        service.auto_move(0)
+        for direction in ('left', 'up', 'right', 'down'):
+            service.change_direction(direction)
+            service.move_snake(1)
+        self.assertEqual(list(board.get_snake()), [(3, 4), (2, 4), (2, 3)])
+        service._pathfinder.update()
+        self.assert_field_is_rebuilt(service, board)
+
+    def test_head_back_without_the_service(self):
+        board = Board(9, 0, 'list', random.Random(1))
+        pathfinder = Pathfinder(board)
+        for direction in ([0, -1], [-1, 0], [0, 1], [1, 0]):
+            head_x, head_y = board.get_snake_head()
+            board.move(head_x, head_y, direction)
+            board.set_direction(direction)
+        pathfinder.update()
+        self.assertEqual(field_of(pathfinder), field_of(Pathfinder(board)))
+
+    def test_random_games(self):
+        # Games mixing the autopilot, manual moves and turns, checked against a new field after every command
+        for seed in range(30):
+            rng = random.Random(seed)
+            board = Board(rng.choice([7, 9, 11]), rng.randint(1, 5), 'list', random.Random(seed))
+            service = Service(board)
+            for command in range(150):
+                choice = rng.random()
+                try:
+                    if choice < 0.6:
+                        service.auto_move(rng.randint(1, 3))
+                    elif choice < 0.8:
+                        service.change_direction(rng.choice(['up', 'down', 'left', 'right']))
+                    else:
+                        service.move_snake(rng.randint(1, 2))
+                except ServiceError:
+                    continue
+                except BoardError:
+                    break
+                if service._pathfinder is not None:
+                    service._pathfinder.update()
+                    self.assert_field_is_rebuilt(service, board)
+
+    def test_no_pocket_while_the_tail_can_be_reached(self):
+        # These games used to send the snake into a pocket of its own body while there was a way to its tail
+        for seed in (7, 11, 23):
+            board = Board(11, 5, 'list', random.Random(seed))
+            service = Service(board)
+            try:
+                service.auto_move(1000)
+            except BoardFullError:
+                pass
+            self.assertGreater(len(board.get_snake()), 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
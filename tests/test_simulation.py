@@ -0,0 +1,18 @@
+import unittest
+from Service.simulation import run_game, run_games
+
+
+def random_strategy(board, rng):
+    return rng.choice(['up', 'down', 'left', 'right', None])
+
+
+class SimulationTest(unittest.TestCase):
+    def test_random_strategy_is_repeatable(self):
+        seeds = range(12)
+        alone = run_games(random_strategy, seeds, 9, 3, 500, workers=1)
+        self.assertEqual(run_games(random_strategy, seeds, 9, 3, 500, workers=3), alone)
+        self.assertEqual([run_game(random_strategy, seed, 9, 3, 500) for seed in seeds], alone)
+
+
+if __name__ == '__main__':
+    unittest.main()
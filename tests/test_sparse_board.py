@@ -0,0 +1,65 @@
+import random
+import unittest
+from Entities.board import Board, BoardError
+from Entities.sparse_board import SparseBoard
+from Entities.stats import Stats
+
+
+class SparseBoardTest(unittest.TestCase):
+    def test_rejected_apples_are_counted(self):
+        # Every draw which lands on the snake, on an apple or next to one is counted
+        rng = random.Random(2)
+        board = SparseBoard(5, 0, 'list', rng)
+        stats = Stats()
+        board.set_stats(stats)
+        replay = random.Random(2)
+        rejections = 0
+        for apple in range(4):
+            state = replay.getstate()
+            rng.setstate(state)
+            while True:
+                row, column = divmod(replay.randrange(25), 5)
+                if board.can_hold_apple(row, column):
+                    break
+                rejections += 1
+            rng.setstate(state)
+            self.assertEqual(board.place_new_apple(), (row, column))
+        self.assertGreater(rejections, 0)
+        self.assertEqual(stats.get_counter('apple_rejections'), rejections)
+
+
+    def test_straight_moves_match_single_steps(self):
+        # The same games, with every move made in one go and one cell at a time, must end the same way (the moves
+        # stay on the board, so the games go on until the snake hits itself)
+        directions = ([-1, 0], [1, 0], [0, -1], [0, 1])
+        for board_class in (SparseBoard, Board):
+            for seed in range(40):
+                rng = random.Random(seed)
+                boards = [board_class(12, 20, 'list', random.Random(seed)) for copy in range(2)]
+                for command in range(200):
+                    direction = rng.choice(directions)
+                    room = boards[0].count_steps_to_edge(direction, 30)
+                    if direction == [-value for value in boards[0].get_direction()] or room == 0:
+                        continue
+                    steps = rng.randint(1, room)
+                    errors = []
+                    try:
+                        boards[0].move_straight(direction, steps)
+                    except BoardError as be:
+                        errors.append(str(be))
+                    try:
+                        for step in range(steps):
+                            head_x, head_y = boards[1].get_snake_head()
+                            boards[1].move(head_x, head_y, direction)
+                    except BoardError as be:
+                        errors.append(str(be))
+                    for board in boards:
+                        board.set_direction(direction)
+                    self.assertEqual(*[(list(board.get_snake()), sorted(board.get_apples()), str(board),
+                                        board._random.getstate()) for board in boards])
+                    if errors:
+                        self.assertEqual(len(errors), 2)
+                        break
+
+if __name__ == '__main__':
+    unittest.main()